@@ -0,0 +1,277 @@
+"""Module containing workers running ai search outside of tkinter event loop"""
+
+import queue
+import threading
+from typing import Optional
+from model import bitboard
+from engine.engine import Engine
+from engine.search import SearchResult
+
+PREDICTION_TIME_SHARE = 0.25  # part of move time used to predict reply of the player
+
+
+class AiWorker:
+    """Runs move choice of given Engine on a background thread
+
+    Only one search runs at a time. Results are collected with poll from
+    the tkinter thread, results of cancelled searches are thrown away.
+
+    Args:
+        engine (Engine): engine choosing moves
+        time_limit (float): wall clock budget of one search in seconds
+        max_depth (int): maximal depth of iterative deepening
+        node_limit (int | None): optional node budget of one search
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        time_limit: float,
+        max_depth: int,
+        node_limit: Optional[int] = None,
+    ):
+        self.engine = engine
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.node_limit = node_limit
+        self.results: queue.Queue = queue.Queue()
+        self.job = 0
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.pending = False
+        # held while engine searches, engine is shared with Ponderer
+        self.lock = threading.Lock()
+
+    def start(self, own: int, opp: int, ponderer: Optional["Ponderer"] = None):
+        """Function starting search of position on background thread
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+            ponderer (Ponderer | None): answer pondered by it is used instead of searching,
+                its finish has to be called for the position first
+        """
+        self.cancel()
+        if self.thread is not None:
+            self.thread.join()
+        self.job += 1
+        self.pending = True
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self.__run,
+            args=(self.job, self.stop_event, own, opp, ponderer),
+            name="ai-search",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def poll(self) -> Optional[SearchResult]:
+        """Function collecting result of current search without blocking
+
+        Returns:
+            SearchResult | None: result or None if search is still running
+        """
+        while True:
+            try:
+                (job, result) = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if job != self.job:
+                continue
+            self.pending = False
+            if isinstance(result, BaseException):
+                raise result
+            return result
+
+    def cancel(self):
+        """Function stopping current search, its result will never be returned"""
+        self.stop_event.set()
+        self.job += 1
+        self.pending = False
+
+    def is_thinking(self) -> bool:
+        """Is search of current job running or its result not yet collected
+
+        Returns:
+            bool: true if result of current job is still expected
+        """
+        return self.pending
+
+    def __run(
+        self,
+        job: int,
+        stop_event: threading.Event,
+        own: int,
+        opp: int,
+        ponderer: Optional["Ponderer"],
+    ):
+        try:
+            if ponderer is not None:
+                answer = ponderer.take(own, opp)
+                if answer is not None:
+                    self.results.put((job, answer))
+                    return
+            result = self.__search(own, opp, stop_event)
+        except Exception as e:  # pylint: disable=broad-except
+            self.results.put((job, e))
+            return
+        self.results.put((job, result))
+
+    def __search(self, own: int, opp: int, stop_event: threading.Event) -> SearchResult:
+        """Searches move of the ai on turn of the ai, waits until engine is free"""
+        with self.lock:
+            return self.engine.choose_move(
+                own, opp, self.time_limit, self.max_depth, self.node_limit, stop_event
+            )
+
+
+class Ponderer:
+    """Searches answers to possible moves of the player while the player thinks
+
+    Predicted move of the player is pondered first, then the other legal moves.
+    Every answer is searched with the settings of the worker, so a pondered
+    answer is as good as a search started after the move. When the player
+    moves, finish stops pondering, unless the answer of the reached position
+    is being searched, that search is let finish. take then waits for the
+    pondering thread and returns the answer.
+
+    Args:
+        worker (AiWorker): worker whose engine and settings are used
+    """
+
+    def __init__(self, worker: AiWorker):
+        self.worker = worker
+        self.answers: dict = {}
+        self.answers_lock = threading.Lock()
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        self.finish_event = threading.Event()  # stop after answer being searched
+        self.searching: Optional[tuple] = None  # position whose answer is being searched
+
+    def start(self, own: int, opp: int):
+        """Function starting pondering of position with the player to move
+
+        Args:
+            own (int): bitboard of the player
+            opp (int): bitboard of the ai
+        """
+        self.stop()
+        with self.answers_lock:
+            self.answers = {}
+        self.stop_event = threading.Event()
+        self.finish_event = threading.Event()
+        self.thread = threading.Thread(
+            target=self.__run,
+            args=(self.stop_event, self.finish_event, own, opp),
+            name="ai-ponder",
+            daemon=True,
+        )
+        self.thread.start()
+
+    def stop(self):
+        """Function stopping pondering, returns when engine is free again"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def cancel(self):
+        """Function stopping pondering and throwing its answers away"""
+        self.stop()
+        with self.answers_lock:
+            self.answers = {}
+
+    def finish(self, own: int, opp: int):
+        """Function ending pondering after the player moved, does not block
+
+        Search of the answer to reached position is let finish, any other
+        search is stopped and answers of other positions are thrown away.
+
+        Args:
+            own (int): bitboard of the ai
+            opp (int): bitboard of the player
+        """
+        position = (own, opp)
+        with self.answers_lock:
+            self.answers = {
+                key: answer for key, answer in self.answers.items() if key == position
+            }
+            if not self.answers and self.searching == position:
+                self.finish_event.set()
+            else:
+                self.stop_event.set()
+
+    def take(self, own: int, opp: int) -> Optional[SearchResult]:
+        """Function waiting for pondering thread and taking answer of reached position,
+        called from ai search thread after finish
+
+        Args:
+            own (int): bitboard of the ai
+            opp (int): bitboard of the player
+
+        Returns:
+            SearchResult | None: pondered answer or None if position was not pondered to the end
+        """
+        thread = self.thread
+        if thread is not None:
+            thread.join()
+        with self.answers_lock:
+            answer = self.answers.get((own, opp))
+            self.answers = {}
+        return answer
+
+    def is_pondering(self) -> bool:
+        """Is pondering thread running
+
+        Returns:
+            bool: true if pondering was started and not stopped or finished
+        """
+        return self.thread is not None and self.thread.is_alive()
+
+    def __run(
+        self, stop_event: threading.Event, finish_event: threading.Event, own: int, opp: int
+    ):
+        worker = self.worker
+        moves = bitboard.legal_moves(own, opp)
+        if not moves:
+            return
+        try:
+            prediction = self.__search(
+                own, opp, worker.time_limit * PREDICTION_TIME_SHARE, stop_event
+            )
+            replies = list(bitboard.iter_squares(moves))
+            if prediction.move in replies:
+                replies.remove(prediction.move)
+                replies.insert(0, prediction.move)
+
+            for sq in replies:
+                (player, ai) = bitboard.play(own, opp, sq)
+                if not bitboard.legal_moves(ai, player):
+                    continue  # ai passes, nothing to search
+                with self.answers_lock:
+                    if stop_event.is_set() or finish_event.is_set():
+                        return
+                    self.searching = (ai, player)
+                answer = self.__search(ai, player, worker.time_limit, stop_event)
+                # answer of interrupted search is shallower than a normal one
+                with self.answers_lock:
+                    self.searching = None
+                    if stop_event.is_set():
+                        return
+                    self.answers[(ai, player)] = answer
+        except Exception:  # pylint: disable=broad-except
+            # pondering is only a speedup, failed answer is searched again on ai turn
+            return
+        finally:
+            with self.answers_lock:
+                self.searching = None
+
+    def __search(
+        self, own: int, opp: int, time_limit: float, stop_event: threading.Event
+    ) -> SearchResult:
+        """Searches position while the player thinks, with depth and node limit of the worker"""
+        worker = self.worker
+        with worker.lock:
+            return worker.engine.choose_move(
+                own, opp, time_limit, worker.max_depth, worker.node_limit, stop_event
+            )
@@ -1,13 +1,31 @@
 """Module containing controller class handling view and model/s
 """
 
-import copy
 import datetime
-import json
 import os
-from types import SimpleNamespace
-from exceptions.exceptions import SaveFormatException
 from model.board import Board
+from model import bitboard
+from model import save
+from model.scoreboard import Scoreboard
+from engine import search
+from engine import endgame
+from engine.engine import DEFAULT_ENDGAME_EMPTIES, create_engine
+from controller.ai_worker import AiWorker, Ponderer
+
+AI_TIME_LIMIT = 1.0  # seconds per move
+AI_NODE_LIMIT = None
+AI_MAX_DEPTH = search.MAX_DEPTH
+AI_TT_SIZE_MB = 16
+AI_WORKERS = 1  # more than 1 splits search between processes
+AI_BOOK_FILE = "book.bin"
+AI_WEIGHTS_FILE = "weights.npz"  # trained evaluation weights, built-in weights are used if missing
+AI_ENDGAME_EMPTIES = DEFAULT_ENDGAME_EMPTIES  # solve exactly with this many empties or less
+AI_ENDGAME_MODE = endgame.EXACT
+AI_POLL_INTERVAL = 20  # milliseconds between checks of background search
+AI_PONDER = True  # search answers to player's moves while the player thinks
+SCOREBOARD_FILE = "scoreboard.db"
+LEGACY_SCOREBOARD_FILE = "scoreboard.txt"  # imported into SCOREBOARD_FILE on first start
+LEADERBOARD_PAGE_SIZE = 15
 
 
 class Controller:
@@ -20,7 +38,20 @@ class Controller:
         self.leaderboard = leaderboard
         self.passed = False
         self.end = False
-        self.scoreboard: dict[str, int]
+        self.scoreboard = Scoreboard(SCOREBOARD_FILE, LEGACY_SCOREBOARD_FILE)
+        self.engine = create_engine(
+            AI_WEIGHTS_FILE,
+            AI_BOOK_FILE,
+            AI_WORKERS,
+            AI_TT_SIZE_MB,
+            AI_ENDGAME_EMPTIES,
+            AI_ENDGAME_MODE,
+        )
+        self.searcher = self.engine.searcher
+        self.ai_worker = AiWorker(
+            self.engine, AI_TIME_LIMIT, AI_MAX_DEPTH, AI_NODE_LIMIT
+        )
+        self.ponderer = Ponderer(self.ai_worker) if AI_PONDER else None
 
         self.read_scores()
 
@@ -36,51 +67,13 @@ class Controller:
             bool: True if move is valid, False otherwise
         """
 
-        board = self.board.board
-
-        if player == 0:
-            color = "black"
-        else:
-            color = "white"
-
-        if board[x][y] != "":
-            return False
-
-        if x < 0 and y < 0 and x > 7 and y > 7:
+        if not (0 <= x <= 7 and 0 <= y <= 7):
             return False
 
-        neighbors = self.__get_neighbors(board, x, y)
-
-        if not neighbors:
-            return False
-
-        valid = False
-
-        for neighbor in neighbors:
-            neighbor_x = neighbor[0]
-            neighbor_y = neighbor[1]
-
-            if board[neighbor_x][neighbor_y] == color:
-                continue
-
-            direction_vector = (neighbor_x - x, neighbor_y - y)
-            current_x = neighbor_x
-            current_y = neighbor_y
-
-            while 0 <= current_x <= 7 and 0 <= current_y <= 7:
-                if board[current_x][current_y] == "":
-                    break
-                if board[current_x][current_y] == color:
-                    valid = True
-                    break
-
-                current_x += direction_vector[0]
-                current_y += direction_vector[1]
-
-        return valid
+        return bool(self.board.legal_moves(player) >> bitboard.square(x, y) & 1)
 
     def move(self, x, y) -> list:
-        """Function making a move
+        """Function making a move for current player
 
         Args:
             x (int): first coordinate of move
@@ -90,142 +83,8 @@ class Controller:
             list(list(str)): board after move
         """
 
-        # Determine color of player
-        color = self.board.get_player_color()
-
-        work_board = copy.deepcopy(self.board.board)
-        work_board[x][y] = color
-        neighbors = self.__get_neighbors(work_board, x, y)
-
-        disk_to_convert = []
-
-        # loop checking every found neighbor for line to convert
-        for neighbor in neighbors:
-            line = []
-
-            neighbor_x = neighbor[0]
-            neighbor_y = neighbor[1]
-
-            if work_board[neighbor_x][neighbor_y] == color:
-                continue
-
-            direction_vector = (
-                neighbor_x - x,
-                neighbor_y - y,
-            )  # vector in which way the line will go
-
-            current_x = neighbor_x
-            current_y = neighbor_y
-
-            while 0 <= current_x <= 7 and 0 <= current_y <= 7:
-                line.append((current_x, current_y))
-                if work_board[current_x][current_y] == "":
-                    break
-                if work_board[current_x][current_y] == color:
-                    for disk in line:
-                        disk_to_convert.append(disk)
-                    break
-
-                current_x += direction_vector[0]
-                current_y += direction_vector[1]
-
-        # convert disk to new colors
-        for disk in disk_to_convert:
-            work_board[disk[0]][disk[1]] = color
-
-        return work_board
-
-    def alpha_beta_min_max(
-        self, depth: int, node: list, maximizing_player, alpha, beta
-    ) -> tuple:
-        """min max function using alpha beta pruning to find best move for ai
-
-        Args:
-            depth (int): depth of the decision tree
-            node (list): starting board state
-            maximizing_player (bool): True(or 1) if player is wants move with highest score
-                                    else with the lowest (usually white player is maximizing)
-            alpha (int): minimum score maximizing player is assured of
-            beta (int): maximum score minimizing player is assured of
-
-
-        Returns:
-            tuple: Depending on depth of current recursion depth returns a tuple
-            with score and board state with the best score,
-            and when we are not considering leafs of the tree coordinates of move made.
-
-        """
-        boards = []
-        choices = []
-
-        # get every possible state from current board/node
-        for x in range(8):
-            for y in range(8):
-                if self.validate(maximizing_player, x, y):
-                    boards.append(self.move(x, y))
-                    choices.append((x, y))
-
-        # Condition to break recursion
-        if depth == 0 or len(choices) == 0:
-            return (self.__move_score(node, maximizing_player), node)
-
-        if maximizing_player:
-            best = -float("inf")
-            best_board = []
-            best_choice = []
-            for board in boards:
-                score = self.alpha_beta_min_max(depth - 1, board, False, alpha, beta)[0]
-                if score > best:
-                    best = score
-                    best_board = board
-                    best_choice = choices[boards.index(board)]
-                alpha = max(alpha, best)
-                if beta <= alpha:
-                    break
-            return (best, best_board, best_choice)
-
-        best = float("inf")
-        best_board = []
-        best_choice = []
-        for board in boards:
-            score = self.alpha_beta_min_max(depth - 1, board, True, alpha, beta)[0]
-            if score < best:
-                best = score
-                best_board = board
-                best_choice = choices[boards.index(board)]
-            beta = min(beta, best)
-            if beta <= alpha:
-                break
-        return (best, best_board, best_choice)
-
-    def __move_score(self, board, maximizing_player) -> int:
-        """Simple algorithm evaluating score of given board state
-        for maximizing or minimizing player
-
-        Args:
-            board (list(list(str))): array representing board state after move
-            maximizing_player (bool): True(or 1) if player is wants move with highest score
-                                    else with the lowest (usually white player is maximizing)
-
-        Returns:
-            int: Score of given board state
-        """
-        score = 0
-
-        if maximizing_player == 0:
-            player = "black"
-            enemy = "white"
-        else:
-            player = "white"
-            enemy = "black"
-
-        for row in enumerate(self.board.board):
-            for field in enumerate(row[1]):
-                if board[row[0]][field[0]] == player:
-                    score += 1
-                elif board[row[0]][field[0]] == enemy:
-                    score -= 1
-        return score
+        self.board.play(self.board.player, bitboard.square(x, y))
+        return self.board.board
 
     def handle_user_input(self, x, y):
         """Method handling user input for given array coordinates
@@ -235,33 +94,32 @@ class Controller:
             y (float): second array coordinate
         """
 
+        # board is locked while ai is thinking
+        if self.ai_worker.is_thinking():
+            return
+
         if self.validate(self.board.player, int(x), int(y)) and (
             not self.board.ai or (self.board.ai and self.board.player == 0)
         ):
-            self.board.board = self.move(int(x), int(y))
-            self.view.draw_played_disk(int(x), int(y), self.board.get_player_color())
-            self.view.update_board(self.board.board)
+            board = self.move(int(x), int(y))
+            self.view.animate_move(int(x), int(y), self.board.get_player_color(), board)
             self.switch_turn()
 
-        # Loop for ai to continue making moves if player needs to pass without player clicking mouse
-        while True:
-            # Check if next player needs to pass
-            self.check_pass()
-            self.check_if_board_is_full()
-
-            self.handle_pass()
+        self.advance_turn()
 
-            if self.board.ai and self.board.player == 1:
+    def advance_turn(self):
+        """Checks pass and end after a move and lets ai play when it is its turn"""
+        # Check if next player needs to pass
+        self.check_pass()
+        self.check_if_board_is_full()
 
-                self.ai_move()
+        self.handle_pass()
 
-                self.check_pass()
-                self.check_if_board_is_full()
-                self.handle_pass()
-                if not self.passed:
-                    break
-            else:
-                break  # when ai needs to pass or not ai
+        if self.board.ai and self.board.player == 1:
+            self.ai_move()
+        elif self.passed:
+            # ai had to pass, pondered position was not reached
+            self.start_pondering()
 
     def handle_pass(self):
         """Handle pass and end"""
@@ -276,9 +134,9 @@ class Controller:
 
             (nickname_black, nickname_white) = self.view.leaderboard_window()
             self.add_to_scoreboard(score, nickname_black, nickname_white)
-            self.save_scores()
 
             # clearing board after game ends
+            self.cancel_ai_move()
             self.end = False
             self.passed = False
             self.menu.button_continue["state"] = "disabled"
@@ -287,18 +145,58 @@ class Controller:
             self.menu.root.show_menu()
 
     def ai_move(self):
-        """Computer move"""
-        ai_move_result: tuple = self.alpha_beta_min_max(
-            3, self.board.board, 1, -float("inf"), float("inf")
-        )
-        self.board.board = ai_move_result[1]
-        if len(ai_move_result) == 3:
-            x_ai = ai_move_result[2][0]
-            y_ai = ai_move_result[2][1]
-            self.view.draw_played_disk(x_ai, y_ai, self.board.get_player_color())
+        """Starts computer move, engine runs on background thread
+        and its result is picked up by poll_ai_move. Answer found
+        by pondering is used without searching again"""
+        own, opp = self.board.get_bitboards(self.board.player)
+        if self.ponderer is not None:
+            self.ponderer.finish(own, opp)
+        self.ai_worker.start(own, opp, self.ponderer)
+        self.view.schedule(AI_POLL_INTERVAL, self.poll_ai_move)
+
+    def start_pondering(self):
+        """Starts pondering when player is to move in game vs ai"""
+        if (
+            self.ponderer is not None
+            and self.board.ai
+            and self.board.player == 0
+            and self.board.has_legal_move(0)
+        ):
+            (own, opp) = self.board.get_bitboards(0)
+            self.ponderer.start(own, opp)
+
+    def poll_ai_move(self):
+        """Plays computer move when background search is finished, otherwise polls again later"""
+        result = self.ai_worker.poll()
+        if result is None:
+            if self.ai_worker.is_thinking():
+                self.view.schedule(AI_POLL_INTERVAL, self.poll_ai_move)
+            return
+
+        self.play_ai_move(result.move)
+
+    def play_ai_move(self, move):
+        """Plays computer move and continues the game
+
+        Args:
+            move (int | None): bit index of move, None if computer passes
+        """
+        if move is not None:
+            self.board.play(self.board.player, move)
+            (x_ai, y_ai) = bitboard.coordinates(move)
+            self.view.animate_move(
+                x_ai, y_ai, self.board.get_player_color(), self.board.board
+            )
 
-        self.view.update_board(self.board.board)
         self.switch_turn()
+        self.advance_turn()
+        self.start_pondering()
+
+    def cancel_ai_move(self):
+        """Stops computer move in progress and pondering, their results are discarded"""
+        self.ai_worker.cancel()
+        if self.ponderer is not None:
+            self.ponderer.cancel()
 
     def get_score(self) -> dict:
         """Function to get the score at the end of the game
@@ -306,23 +204,11 @@ class Controller:
         Returns:
             dict(int, int): Dictionary of key:player and value:score
         """
-        scores = {0: 0, 1: 0}
-        for row in enumerate(self.board.board):
-            for color in enumerate(row[1]):
-                if color[1] == "black":
-                    scores[0] += 1
-                else:
-                    scores[1] += 1
-        return scores
+        return {0: self.board.counts[0], 1: self.board.counts[1]}
 
     def check_pass(self):
         """Checks if player needs to pass as there is no valid move to be made"""
-        should_pass = True
-        valid_moves = self.__find_valid_moves()
-        if valid_moves:
-            should_pass = False
-
-        if should_pass:
+        if not self.board.has_legal_move(self.board.player):
             if self.passed:
                 self.end = True
             else:
@@ -332,14 +218,7 @@ class Controller:
 
     def check_if_board_is_full(self):
         """Function ending game if board is full"""
-        is_board_full: bool = True
-        for row in enumerate(self.board.board):
-            for field in enumerate(row[1]):
-                if field[1] == "":
-                    is_board_full = False
-                    break
-
-        if is_board_full:
+        if self.board.is_full():
             self.end = True
 
     def switch_turn(self):
@@ -363,44 +242,63 @@ class Controller:
 
         filepath = os.path.join(save_dir, filename)
 
-        with open(filepath, "w", encoding="UTF-8") as f:
-            f.write(repr(self.board))
+        save.save(filepath, self.board)
 
     def load_form_file(self, filepath: str):
         """Function loading game state from file
 
         Args:
             filepath (str): file path taken from user
+
+        Raises:
+            SaveFormatException: when file is not a game save
         """
-        with open(filepath, "r", encoding="UTF-8") as f:
-            read_json = f.readline()
-            if self.__validate_data(json.loads(read_json)):
-                loaded_board = json.loads(
-                    read_json, object_hook=lambda x: SimpleNamespace(**x)
-                )
-                self.board.board = loaded_board.board
-                self.board.ai = loaded_board.ai
-                self.board.player = loaded_board.player
-                self.view.update_board(self.board.board)
-                self.view.set_current_player_label(self.board.get_player_color())
-            else:
-                raise SaveFormatException(f"Invalid save file: {filepath}")
+        loaded_board = save.load(filepath)
+        self.cancel_ai_move()
+        self.board = loaded_board
+        self.passed = False
+        self.view.update_board(self.board.board)
+        self.view.set_current_player_label(self.board.get_player_color())
+        self.start_pondering()
+
+    def read_scores(self):
+        """Function showing first page of scoreboard in leaderboard"""
+        self.show_leaderboard_page(0)
 
-    def save_scores(self):
-        """Function saving scoreboard to file"""
-        with open("scoreboard.txt", "w", encoding="UTF-8") as f:
+    def leaderboard_page(self, page: int, query: str = "") -> tuple[list, int, int]:
+        """Function reading one page of scoreboard sorted by score
 
-            f.write(json.dumps(self.scoreboard))
+        Args:
+            page (int): page number starting from 0, clamped to existing pages
+            query (str): only nicknames starting with query are listed
 
-    def read_scores(self):
-        """Function reading scores from file"""
-        if os.path.exists("scoreboard.txt"):
-            with open("scoreboard.txt", "r", encoding="UTF-8") as f:
-                self.scoreboard = json.loads(f.readline())
+        Returns:
+            tuple[list, int, int]: (rows, page, page count), rows are (rank, nickname, score)
+        """
+        total = self.scoreboard.count(query)
+        page_count = max(1, -(-total // LEADERBOARD_PAGE_SIZE))
+        page = min(max(page, 0), page_count - 1)
+        offset = page * LEADERBOARD_PAGE_SIZE
+        if query:
+            rows = self.scoreboard.search_ranked(query, LEADERBOARD_PAGE_SIZE, offset)
         else:
-            self.scoreboard = {}
+            rows = [
+                (offset + index + 1, nickname, score)
+                for index, (nickname, score) in enumerate(
+                    self.scoreboard.top(LEADERBOARD_PAGE_SIZE, offset)
+                )
+            ]
+        return rows, page, page_count
 
-        self.leaderboard.populate_leaderboard(self.scoreboard)
+    def show_leaderboard_page(self, page: int, query: str = ""):
+        """Function showing one page of scoreboard in leaderboard
+
+        Args:
+            page (int): page number starting from 0
+            query (str): only nicknames starting with query are listed
+        """
+        (rows, page, page_count) = self.leaderboard_page(page, query)
+        self.leaderboard.populate_leaderboard(rows, page, page_count, query)
 
     def add_to_scoreboard(self, score: dict, nickname_black: str, nickname_white: str):
         """Function adding score to scoreboard
@@ -411,20 +309,18 @@ class Controller:
             nickname_black (str): nickname given by black player
             nickname_white (str): nickname given by white player
         """
-        if nickname_black != "null":
-            if nickname_black not in self.scoreboard.keys():
-                self.scoreboard[nickname_black] = score[0]
-            else:
-                self.scoreboard[nickname_black] += score[0]
-        if nickname_white != "null":
-            if nickname_white not in self.scoreboard.keys():
-                self.scoreboard[nickname_white] = score[1]
-            else:
-                self.scoreboard[nickname_white] += score[1]
-        self.leaderboard.populate_leaderboard(self.scoreboard)
+        results = [
+            (nickname, score[player])
+            for player, nickname in ((0, nickname_black), (1, nickname_white))
+            if nickname and nickname != "null"
+        ]
+        if results:
+            self.scoreboard.add_results(results)
+        self.read_scores()
 
     def new_game(self):
         """Function starting new game with clean board"""
+        self.cancel_ai_move()
         self.board = Board()
         self.board.ai = False
         self.view.update_board(self.board.board)
@@ -435,6 +331,7 @@ class Controller:
 
     def new_game_vs_ai(self):
         """Function starting new game vs ai"""
+        self.cancel_ai_move()
         self.board = Board()
         self.board.ai = True
         self.view.update_board(self.board.board)
@@ -442,6 +339,7 @@ class Controller:
             self.view.set_current_player_label("black")
         else:
             self.view.set_current_player_label("white")
+        self.start_pondering()
 
     def is_game_vs_ai(self):
         """Is game vs ai
@@ -460,69 +358,4 @@ class Controller:
         """
         now = datetime.datetime.now()
         date_str = now.strftime("%Y-%m-%d_%H-%M-%S")
-        return f"save_{date_str}.txt"
-
-    def __get_neighbors(self, board: list, x: int, y: int) -> list:
-        """Class getting neighbors of given coordinates on the board
-
-        Args:
-            board (list): array representing game board
-            x (int): first coordinate
-            y (int): last coordinate
-
-        Returns:
-            list: neighbors of given coordinates
-        """
-        neighbors = []
-        for i in range(max(0, x - 1), min(x + 2, 8)):
-            for j in range(max(0, y - 1), min(y + 2, 8)):
-                if board[i][j] != "":
-                    neighbors.append((i, j))
-        return neighbors
-
-    def __find_valid_moves(self) -> list:
-        """Function finding all valid moves on the board
-
-
-        Returns:
-            list: List of tuples with coordinates of valid moves
-        """
-        valid_moves: list[tuple[int, int]] = []
-        for row in enumerate(self.board.board):
-            for field in enumerate(row[1]):
-                if self.validate(self.board.player, row[0], field[0]) is True:
-                    valid_moves.append((row[0], field[0]))
-
-        return valid_moves
-
-    def __validate_data(self, data) -> bool:
-        """Validate if data in save file conforms to json save format
-
-        Args:
-            data (json_data): json data read of file
-
-        Returns:
-            bool: True if data in save file conforms to json save format
-        """
-        required_keys = {
-            "ai": bool,
-            "player": int,
-            "board": list
-        }
-
-        for key, value_type in required_keys.items():
-            if key not in data or not isinstance(data[key], value_type):
-                return False
-
-        board = data["board"]
-        if len(board) != 8:
-            return False
-
-        for row in board:
-            if not isinstance(row, list) or len(row) != 8:
-                return False
-            for cell in row:
-                if cell not in {"", "white", "black"}:
-                    return False
-
-        return True
+        return f"save_{date_str}.sav"
@@ -0,0 +1,214 @@
+"""Module containing opt-in profiling of game sessions
+
+Profiler replaces methods of controller, view and engine objects with timed
+wrappers, nothing is changed when profiling is off. Every wrapped call is a
+span of one category. Spans nest (handle_user_input calls update_board), the
+report counts self time of every span, time of nested spans is subtracted,
+so categories add up to the time spent inside wrapped calls.
+
+Categories:
+    engine      search of ai move on background thread, concurrent with the rest
+    ponder      search of answers while the player thinks, concurrent with the rest
+    render      drawing board, animations and leaderboard
+    io          save files and scoreboard database
+    dialog      message boxes waiting for the player
+    controller  game logic of wrapped controller methods
+
+Profiling is enabled with RIVERSI_PROFILE=<report path> or main.py --profile
+<report path>, RIVERSI_CPROFILE=1 or --cprofile also captures cProfile of the
+tkinter thread into <report path>.prof.
+"""
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+PROFILE_ENV = "RIVERSI_PROFILE"
+CPROFILE_ENV = "RIVERSI_CPROFILE"
+CPROFILE_SUFFIX = ".prof"
+CPROFILE_LINES = 25  # functions listed in report
+
+ENGINE = "engine"
+PONDER = "ponder"
+RENDER = "render"
+IO = "io"
+DIALOG = "dialog"
+CONTROLLER = "controller"
+CATEGORIES = (ENGINE, PONDER, RENDER, IO, DIALOG, CONTROLLER)
+
+
+@dataclass
+class Span:
+    """Accumulated timing of one wrapped method"""
+
+    category: str
+    calls: int = 0
+    total: float = 0.0
+    own: float = 0.0  # total without nested spans
+    longest: float = 0.0
+
+
+class Profiler:
+    """Collector of timing spans of one session
+
+    Args:
+        report_path (str): file the report is written to by close
+        capture (bool): True to run cProfile on the thread creating profiler
+    """
+
+    def __init__(self, report_path: str, capture: bool = False):
+        self.report_path = report_path
+        self.spans: dict[str, Span] = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.start = time.perf_counter()
+        self.profile: Optional[cProfile.Profile] = None
+        if capture:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def wrap(self, target, name: str, category: str):
+        """Function replacing method of object with timed wrapper
+
+        Args:
+            target (object): object whose method is wrapped
+            name (str): attribute name of method
+            category (str): one of CATEGORIES
+        """
+        method = getattr(target, name)
+        label = f"{type(target).__name__}.{name.rsplit('__', 1)[-1]}"
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            self.enter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.exit(label, category)
+
+        setattr(target, name, timed)
+
+    def enter(self):
+        """Function starting span on current thread"""
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        # [start, time of nested spans]
+        self.local.stack.append([time.perf_counter(), 0.0])
+
+    def exit(self, label: str, category: str):
+        """Function finishing span started by the last enter on current thread
+
+        Args:
+            label (str): name of span in report
+            category (str): one of CATEGORIES
+        """
+        (start, nested) = self.local.stack.pop()
+        elapsed = time.perf_counter() - start
+        if self.local.stack:
+            self.local.stack[-1][1] += elapsed
+        with self.lock:
+            span = self.spans.setdefault(label, Span(category))
+            span.calls += 1
+            span.total += elapsed
+            span.own += elapsed - nested
+            span.longest = max(span.longest, elapsed)
+
+    def report(self) -> str:
+        """Function formatting report of session so far
+
+        Returns:
+            str: report text
+        """
+        session = time.perf_counter() - self.start
+        with self.lock:
+            spans = sorted(self.spans.items(), key=lambda item: -item[1].own)
+        lines = [f"Session {session:.3f} s", "", "category        seconds  session"]
+        for category in CATEGORIES:
+            seconds = sum(span.own for _, span in spans if span.category == category)
+            share = seconds / session if session else 0.0
+            lines.append(f"{category:<12} {seconds:>10.3f} {share:>8.1%}")
+        lines += [
+            "",
+            f"{'span':<32} {'category':<10} {'calls':>7} {'total':>9} "
+            f"{'self':>9} {'mean ms':>8} {'max ms':>8}",
+        ]
+        for label, span in spans:
+            lines.append(
+                f"{label:<32} {span.category:<10} {span.calls:>7} {span.total:>9.3f} "
+                f"{span.own:>9.3f} {span.total / span.calls * 1000:>8.2f} "
+                f"{span.longest * 1000:>8.2f}"
+            )
+        return "\n".join(lines) + "\n"
+
+    def close(self):
+        """Function stopping cProfile and writing report of session"""
+        report = self.report()
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.report_path + CPROFILE_SUFFIX)
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profile, stream=stream)
+            stats.sort_stats("cumulative").print_stats(CPROFILE_LINES)
+            report += "\ncProfile of tkinter thread\n" + stream.getvalue()
+            self.profile = None
+        with open(self.report_path, "w", encoding="UTF-8") as f:
+            f.write(report)
+
+
+def from_environment(
+    report_path: Optional[str] = None, capture: bool = False
+) -> Optional[Profiler]:
+    """Function creating profiler when profiling is requested
+
+    Args:
+        report_path (str | None): report path given on command line, RIVERSI_PROFILE is used if None
+        capture (bool): True if cProfile was requested on command line
+
+    Returns:
+        Profiler | None: running profiler or None if profiling is off
+    """
+    if report_path is None:
+        report_path = os.environ.get(PROFILE_ENV) or None
+    if report_path is None:
+        return None
+    capture = capture or os.environ.get(CPROFILE_ENV, "") not in ("", "0")
+    return Profiler(report_path, capture)
+
+
+def install(profiler: Profiler, controller, game, leaderboard):
+    """Function wrapping hot paths of running application
+
+    Args:
+        profiler (Profiler): collector of spans
+        controller (Controller): game controller
+        game (Game): game view
+        leaderboard (Leaderboard): leaderboard view
+    """
+    for name in (
+        "handle_user_input",
+        "check_pass",
+        "advance_turn",
+        "poll_ai_move",
+        "play_ai_move",
+        "new_game",
+        "new_game_vs_ai",
+        "ai_move",
+    ):
+        profiler.wrap(controller, name, CONTROLLER)
+    # engine is shared by both, only searches started on turn of the ai are engine time
+    profiler.wrap(controller.ai_worker, "_AiWorker__search", ENGINE)
+    if controller.ponderer is not None:
+        profiler.wrap(controller.ponderer, "_Ponderer__search", PONDER)
+    for name in ("save_to_file", "load_form_file", "add_to_scoreboard", "leaderboard_page"):
+        profiler.wrap(controller, name, IO)
+    for name in ("update_board", "animate_move", "_Game__animate_frame"):
+        profiler.wrap(game, name, RENDER)
+    profiler.wrap(leaderboard, "populate_leaderboard", RENDER)
+    for name in ("end_game_message", "pass_window", "leaderboard_window"):
+        profiler.wrap(game, name, DIALOG)
@@ -0,0 +1,198 @@
+"""Module containing opening book
+
+Book is a binary file with a header followed by fixed size records sorted by key.
+Key is Zobrist hash of the symmetry normalized position (see bitboard.canonical),
+so all 8 symmetric variants of a position share their entries. File is memory
+mapped and binary searched, opening a book does not read it.
+
+Record: key (uint64), move in normalized position (uint8), pad, count (uint16)
+"""
+
+import mmap
+import os
+import struct
+from typing import Iterable, Optional
+from exceptions.exceptions import BookFormatException, IllegalMoveException
+from model import bitboard
+from engine.transposition import zobrist
+
+MAGIC = b"RVBK"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxQ")
+RECORD = struct.Struct("<QBxH")
+DEFAULT_MAX_PLIES = 14
+MAX_COUNT = 0xFFFF
+
+
+def position_key(own: int, opp: int) -> tuple[int, list]:
+    """Function computing book key of position
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+
+    Returns:
+        tuple[int, list[int]]: (key, every symmetry transforming position to normalized one),
+            symmetric positions (e.g. start position) have more than one
+    """
+    (canonical_own, canonical_opp, _) = bitboard.canonical(own, opp)
+    symmetries = [
+        symmetry
+        for symmetry in range(8)
+        if bitboard.transform(own, symmetry) == canonical_own
+        and bitboard.transform(opp, symmetry) == canonical_opp
+    ]
+    return zobrist(canonical_own, canonical_opp), symmetries
+
+
+def normalize_move(sq: int, symmetries: list) -> int:
+    """Function translating move to normalized position,
+    moves equivalent by symmetry of the position get the same square
+
+    Args:
+        sq (int): bit index of move
+        symmetries (list[int]): symmetries returned by position_key
+
+    Returns:
+        int: bit index of move in normalized position
+    """
+    return min(
+        bitboard.transform(1 << sq, symmetry).bit_length() - 1 for symmetry in symmetries
+    )
+
+
+class OpeningBook:
+    """Memory mapped opening book
+
+    Args:
+        path (str): path of book file
+
+    Raises:
+        BookFormatException: when file is not a book
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise BookFormatException(f"Invalid book file: {path}")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.count) = HEADER.unpack_from(self.data, 0)
+        if (
+            magic != MAGIC
+            or version != VERSION
+            or size != HEADER.size + self.count * RECORD.size
+        ):
+            self.data.close()
+            raise BookFormatException(f"Invalid book file: {path}")
+
+    def close(self):
+        """Function unmapping book file"""
+        self.data.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def entries(self, key: int) -> list:
+        """Function finding every record of key
+
+        Args:
+            key (int): book key of position
+
+        Returns:
+            list[tuple[int, int]]: (normalized move, count) pairs
+        """
+        low = 0
+        high = self.count
+        while low < high:
+            middle = (low + high) // 2
+            if RECORD.unpack_from(self.data, HEADER.size + middle * RECORD.size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        found = []
+        while low < self.count:
+            (record_key, move, count) = RECORD.unpack_from(
+                self.data, HEADER.size + low * RECORD.size
+            )
+            if record_key != key:
+                break
+            found.append((move, count))
+            low += 1
+        return found
+
+    def moves(self, own: int, opp: int) -> list:
+        """Function finding book moves of position
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+
+        Returns:
+            list[tuple[int, int]]: (move, count) pairs of legal moves, most played first,
+                moves equivalent by symmetry share the count
+        """
+        (key, symmetries) = position_key(own, opp)
+        entries = dict(self.entries(key))
+        if not entries:
+            return []
+
+        found = []
+        for sq in bitboard.iter_squares(bitboard.legal_moves(own, opp)):
+            normalized = normalize_move(sq, symmetries)
+            if normalized in entries:
+                found.append((sq, entries[normalized]))
+        found.sort(key=lambda entry: (-entry[1], entry[0]))
+        return found
+
+    def lookup(self, own: int, opp: int) -> Optional[int]:
+        """Function choosing book move of position
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+
+        Returns:
+            int | None: most played move or None if position is not in book
+        """
+        found = self.moves(own, opp)
+        if not found:
+            return None
+        return found[0][0]
+
+
+def build_book(
+    games: Iterable[list], path: str, max_plies: int = DEFAULT_MAX_PLIES
+) -> tuple[int, list]:
+    """Function building book file from game records
+
+    Args:
+        games (Iterable[list[int]]): games as lists of move bit indexes
+        path (str): path of written book file
+        max_plies (int): number of moves of every game added to book
+
+    Returns:
+        tuple[int, list[str]]: (number of records, errors of skipped games)
+    """
+    counts: dict[tuple[int, int], int] = {}
+    errors = []
+    for number, moves in enumerate(games, start=1):
+        game_counts = []
+        try:
+            for own, opp, _, sq in bitboard.replay(moves[:max_plies]):
+                (key, symmetries) = position_key(own, opp)
+                game_counts.append((key, normalize_move(sq, symmetries)))
+        except IllegalMoveException as e:
+            errors.append(f"game {number}: {e}")
+            continue
+        for entry in game_counts:
+            counts[entry] = counts.get(entry, 0) + 1
+
+    records = sorted(counts.items())
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(records)))
+        for (key, move), count in records:
+            f.write(RECORD.pack(key, move, min(count, MAX_COUNT)))
+    return len(records), errors
@@ -0,0 +1,271 @@
+"""Module containing game database with position index
+
+Database is a pair of files. Games file holds game records one after
+another, index file maps book key of every position reached in the games
+(Zobrist hash of the symmetry normalized position, see engine.book) to
+the games and moves played from it. Index entries are sorted by key and
+the file is memory mapped, a lookup binary searches it and reads only the
+entries of the position.
+
+Games file: header, then records: result (int8, final black minus white
+disc difference), move count (uint8), moves (uint8 each, passes implied)
+
+Index file: header, game offsets in games file (uint64 each), game results
+(int8 each, padded to 8 bytes), entries: key (uint64), game (uint32),
+ply (uint8), normalized move with side to move in the highest bit (uint8)
+"""
+
+import mmap
+import os
+import struct
+from array import array
+from dataclasses import dataclass
+from typing import Iterable
+import numpy as np
+from exceptions.exceptions import DatabaseFormatException, IllegalMoveException
+from model import bitboard
+from engine.book import normalize_move, position_key
+
+GAMES_MAGIC = b"RVGM"
+INDEX_MAGIC = b"RVGI"
+VERSION = 1
+GAMES_HEADER = struct.Struct("<4sHxxQ")
+INDEX_HEADER = struct.Struct("<4sHxxQQ")
+RECORD_HEADER = struct.Struct("<bB")
+ENTRY = np.dtype(
+    [("key", "<u8"), ("game", "<u4"), ("ply", "u1"), ("move", "u1")], align=False
+)
+WHITE_TO_MOVE = 0x80
+GAMES_SUFFIX = ".games"
+INDEX_SUFFIX = ".index"
+
+
+@dataclass
+class MoveStatistics:
+    """Results of games continuing from a position with one move,
+    from the point of view of the side to move"""
+
+    move: int
+    games: int
+    wins: int
+    draws: int
+    losses: int
+    average: float  # average final disc difference
+
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _open_mapped(path: str, magic: bytes, header: struct.Struct) -> tuple:
+    """Maps file and checks its header
+
+    Returns:
+        tuple: (mmap, unpacked header fields after magic and version)
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < header.size:
+            raise DatabaseFormatException(f"Invalid database file: {path}")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    fields = header.unpack_from(data, 0)
+    if fields[0] != magic or fields[1] != VERSION:
+        data.close()
+        raise DatabaseFormatException(f"Invalid database file: {path}")
+    return data, fields[2:]
+
+
+class GameDatabase:
+    """Memory mapped game database
+
+    Args:
+        path (str): path of database without suffix, files path.games and path.index are read
+
+    Raises:
+        DatabaseFormatException: when files are not a database
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        (self.games_data, (games_count,)) = _open_mapped(
+            path + GAMES_SUFFIX, GAMES_MAGIC, GAMES_HEADER
+        )
+        (self.index_data, (self.count, entry_count)) = _open_mapped(
+            path + INDEX_SUFFIX, INDEX_MAGIC, INDEX_HEADER
+        )
+        results_start = INDEX_HEADER.size + 8 * self.count
+        entries_start = results_start + _padded(self.count)
+        if (
+            games_count != self.count
+            or len(self.index_data) != entries_start + entry_count * ENTRY.itemsize
+        ):
+            self.close()
+            raise DatabaseFormatException(f"Invalid database: {path}")
+        # views of the mapped file, nothing is copied into memory
+        self.offsets = np.frombuffer(
+            self.index_data, "<u8", self.count, INDEX_HEADER.size
+        )
+        self.results = np.frombuffer(self.index_data, "i1", self.count, results_start)
+        self.entries = np.frombuffer(self.index_data, ENTRY, entry_count, entries_start)
+
+    def close(self):
+        """Function unmapping database files"""
+        # views have to be released before the maps can be closed
+        self.offsets = self.results = self.entries = None
+        self.games_data.close()
+        self.index_data.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def game(self, number: int) -> tuple[list, int]:
+        """Function reading game record
+
+        Args:
+            number (int): game number, 0 is the first game
+
+        Returns:
+            tuple[list[int], int]: (moves, final black minus white disc difference)
+        """
+        offset = int(self.offsets[number])
+        (result, length) = RECORD_HEADER.unpack_from(self.games_data, offset)
+        start = offset + RECORD_HEADER.size
+        return list(self.games_data[start : start + length]), result
+
+    def position_entries(self, own: int, opp: int) -> np.ndarray:
+        """Function finding every index entry of position
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+
+        Returns:
+            np.ndarray: entries with fields key, game, ply and move
+                (normalized move, WHITE_TO_MOVE bit set if white was to move)
+        """
+        (key, _) = position_key(own, opp)
+        keys = self.entries["key"]
+        low = np.searchsorted(keys, np.uint64(key), "left")
+        high = np.searchsorted(keys, np.uint64(key), "right")
+        return self.entries[low:high]
+
+    def games(self, own: int, opp: int) -> list:
+        """Function finding games which reached position
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+
+        Returns:
+            list[tuple[int, int]]: (game number, ply) pairs
+        """
+        found = self.position_entries(own, opp)
+        return list(zip(found["game"].tolist(), found["ply"].tolist()))
+
+    def lookup(self, own: int, opp: int) -> list:
+        """Function collecting statistics of moves played from position
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+
+        Returns:
+            list[MoveStatistics]: one item per played legal move, most played first
+        """
+        found = self.position_entries(own, opp)
+        if not len(found):
+            return []
+        # result from the point of view of player who moved in the game
+        white = (found["move"] & WHITE_TO_MOVE) != 0
+        scores = self.results[found["game"]].astype(np.int64)
+        scores[white] = -scores[white]
+        normalized = found["move"] & ~np.uint8(WHITE_TO_MOVE)
+
+        (_, symmetries) = position_key(own, opp)
+        statistics = []
+        for sq in bitboard.iter_squares(bitboard.legal_moves(own, opp)):
+            move_scores = scores[normalized == normalize_move(sq, symmetries)]
+            if not len(move_scores):
+                continue
+            statistics.append(
+                MoveStatistics(
+                    sq,
+                    len(move_scores),
+                    int((move_scores > 0).sum()),
+                    int((move_scores == 0).sum()),
+                    int((move_scores < 0).sum()),
+                    float(move_scores.mean()),
+                )
+            )
+        statistics.sort(key=lambda item: (-item.games, item.move))
+        return statistics
+
+
+def build_database(games: Iterable[list], path: str) -> tuple[int, list]:
+    """Function writing game database and its position index
+
+    Args:
+        games (Iterable[list[int]]): games as lists of move bit indexes
+        path (str): path of database without suffix
+
+    Returns:
+        tuple[int, list[str]]: (number of stored games, errors of skipped games)
+    """
+    errors = []
+    offsets = array("Q")
+    results = array("b")
+    keys = array("Q")
+    numbers = array("I")
+    plies = array("B")
+    moves_played = array("B")
+
+    with open(path + GAMES_SUFFIX, "wb") as f:
+        f.write(GAMES_HEADER.pack(GAMES_MAGIC, VERSION, 0))
+        offset = GAMES_HEADER.size
+        for number, moves in enumerate(games, start=1):
+            game_entries = []
+            (own, opp, player) = (bitboard.START_BLACK, bitboard.START_WHITE, 0)
+            try:
+                if len(moves) > 60:
+                    raise IllegalMoveException(f"Too many moves: {len(moves)}")
+                for ply, (own, opp, player, sq) in enumerate(bitboard.replay(moves)):
+                    (key, symmetries) = position_key(own, opp)
+                    move = normalize_move(sq, symmetries)
+                    game_entries.append((key, ply, move | (WHITE_TO_MOVE if player else 0)))
+            except IllegalMoveException as e:
+                errors.append(f"game {number}: {e}")
+                continue
+            if moves:
+                (own, opp) = bitboard.play(own, opp, moves[-1])
+            difference = own.bit_count() - opp.bit_count()
+            result = difference if player == 0 else -difference
+
+            game = len(offsets)
+            for key, ply, move in game_entries:
+                keys.append(key)
+                numbers.append(game)
+                plies.append(ply)
+                moves_played.append(move)
+            offsets.append(offset)
+            results.append(result)
+            f.write(RECORD_HEADER.pack(result, len(moves)))
+            f.write(bytes(moves))
+            offset += RECORD_HEADER.size + len(moves)
+        f.seek(0)
+        f.write(GAMES_HEADER.pack(GAMES_MAGIC, VERSION, len(offsets)))
+
+    entries = np.empty(len(keys), ENTRY)
+    entries["key"] = np.frombuffer(keys, np.uint64)
+    entries["game"] = np.frombuffer(numbers, np.uint32)
+    entries["ply"] = np.frombuffer(plies, np.uint8)
+    entries["move"] = np.frombuffer(moves_played, np.uint8)
+    # stable sort keeps entries of one key in game order
+    entries = entries[np.argsort(entries["key"], kind="stable")]
+
+    with open(path + INDEX_SUFFIX, "wb") as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, len(offsets), len(entries)))
+        f.write(offsets.tobytes())
+        f.write(results.tobytes())
+        f.write(bytes(_padded(len(results)) - len(results)))
+        f.write(entries.tobytes())
+    return len(offsets), errors
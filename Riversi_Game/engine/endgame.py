@@ -0,0 +1,268 @@
+"""Module containing exact endgame solver
+
+Solver searches to the end of the game and scores positions by final disc
+difference. Win/loss/draw mode only proves the sign of the result with a null
+window, which is much faster than finding the exact difference.
+
+Move ordering: with many empties moves leaving opponent the fewest replies are
+tried first (fastest first), near the end moves in quadrants with odd number
+of empties are tried first (parity).
+"""
+
+import threading
+import time
+from typing import Optional
+from exceptions.exceptions import SearchAbortedException
+from model import bitboard
+from engine import transposition
+from engine.ordering import CORNERS
+from engine.search import CHECK_INTERVAL, MAX_MOVES, SearchResult, SearchStatistics
+from engine.transposition import TranspositionTable
+
+EXACT = "exact"
+WLD = "wld"
+
+DEFAULT_SIZE_MB = 4
+FASTEST_FIRST_EMPTIES = 7  # fastest first ordering from this many empties up
+TT_EMPTIES = 8  # transposition table used from this many empties up
+
+QUADRANTS = (
+    0x0000_0000_0F0F_0F0F,
+    0x0000_0000_F0F0_F0F0,
+    0x0F0F_0F0F_0000_0000,
+    0xF0F0_F0F0_0000_0000,
+)
+
+
+class EndgameSolver:
+    """Exact solver of positions near the end of the game
+
+    Args:
+        transposition_table (TranspositionTable | None): table used for nodes with many
+            empties, new table of DEFAULT_SIZE_MB is created if not given
+    """
+
+    def __init__(self, transposition_table: Optional[TranspositionTable] = None):
+        if transposition_table is None:
+            transposition_table = TranspositionTable(DEFAULT_SIZE_MB)
+        self.tt = transposition_table
+        self.nodes = 0
+        self.evaluations = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs = [0] * MAX_MOVES
+        self._deadline: Optional[float] = None
+        self._stop_event: Optional[threading.Event] = None
+        self._next_check = CHECK_INTERVAL
+
+    def solve(
+        self,
+        own: int,
+        opp: int,
+        mode: str = EXACT,
+        time_limit: Optional[float] = None,
+        stop_event: Optional[threading.Event] = None,
+    ) -> SearchResult:
+        """Function solving position to the end of the game
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+            mode (str): EXACT for final disc difference, WLD for win (1), draw (0) or loss (-1)
+            time_limit (float | None): optional wall clock budget in seconds
+            stop_event (threading.Event | None): event set from another thread
+                to stop the search early
+
+        Raises:
+            SearchAbortedException: when time runs out or stop is requested
+
+        Returns:
+            SearchResult: best move with its score and statistics, depth is the number of empties
+        """
+        self.tt.new_search()
+        self.nodes = 0
+        self.evaluations = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs = [0] * MAX_MOVES
+        start = time.perf_counter()
+        self._next_check = CHECK_INTERVAL
+        self._deadline = None if time_limit is None else time.perf_counter() + time_limit
+        self._stop_event = stop_event
+        empties = 64 - bitboard.popcount(own | opp)
+        if mode == WLD:
+            (alpha, beta) = (-1, 1)
+        else:
+            (alpha, beta) = (-64, 64)
+
+        try:
+            moves = bitboard.legal_moves(own, opp)
+            if not moves:
+                score = self._solve(own, opp, alpha, beta, empties, False)
+                return SearchResult(
+                    None, self._result(score, mode), empties, self._statistics(empties, start)
+                )
+
+            best_move = None
+            best = -65
+            for sq, flipped in self._order(own, opp, moves, empties):
+                new_own = opp & ~flipped
+                new_opp = own | flipped | (1 << sq)
+                bound = max(alpha, best)
+                if best_move is None:
+                    score = -self._solve(new_own, new_opp, -beta, -bound, empties - 1, False)
+                else:
+                    score = -self._solve(
+                        new_own, new_opp, -bound - 1, -bound, empties - 1, False
+                    )
+                    if bound < score < beta:
+                        score = -self._solve(new_own, new_opp, -beta, -score, empties - 1, False)
+                if score > best:
+                    best = score
+                    best_move = sq
+                    if best >= beta:
+                        break
+            return SearchResult(
+                best_move, self._result(best, mode), empties, self._statistics(empties, start)
+            )
+        finally:
+            self._deadline = None
+            self._stop_event = None
+
+    def _statistics(self, empties: int, start: float) -> SearchStatistics:
+        return SearchStatistics(
+            self.nodes,
+            self.evaluations,
+            self.tt_probes,
+            self.tt_hits,
+            list(self.cutoffs),
+            empties,
+            time.perf_counter() - start,
+        )
+
+    def _result(self, score: int, mode: str) -> int:
+        if mode == WLD:
+            return (score > 0) - (score < 0)
+        return score
+
+    def _check_budget(self):
+        self._next_check = self.nodes + CHECK_INTERVAL
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchAbortedException("Time budget exhausted")
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise SearchAbortedException("Search stopped")
+
+    def _order(self, own: int, opp: int, moves: int, empties: int) -> list:
+        """Orders moves by opponent mobility, parity and corners
+
+        Returns:
+            list[tuple[int, int]]: (move, flipped disks) pairs in search order
+        """
+        ordered = []
+        if empties >= FASTEST_FIRST_EMPTIES:
+            for sq in bitboard.iter_squares(moves):
+                flipped = bitboard.flips(own, opp, sq)
+                replies = bitboard.legal_moves(opp & ~flipped, own | flipped | (1 << sq))
+                key = replies.bit_count() * 2
+                if replies & CORNERS:
+                    key += 1
+                ordered.append((key, sq, flipped))
+            ordered.sort()
+            return [(sq, flipped) for _, sq, flipped in ordered]
+
+        empty = ~(own | opp)
+        odd = 0
+        for quadrant in QUADRANTS:
+            if (empty & quadrant).bit_count() & 1:
+                odd |= quadrant
+        for sq in bitboard.iter_squares(moves & odd):
+            ordered.append((sq, bitboard.flips(own, opp, sq)))
+        for sq in bitboard.iter_squares(moves & ~odd):
+            ordered.append((sq, bitboard.flips(own, opp, sq)))
+        return ordered
+
+    def _last_move(self, own: int, opp: int) -> int:
+        """Scores position with a single empty square"""
+        empty = ~(own | opp) & bitboard.FULL_MASK
+        sq = empty.bit_length() - 1
+        own_count = own.bit_count()
+        flipped = bitboard.flips(own, opp, sq).bit_count()
+        if flipped:
+            return 2 * (own_count + flipped + 1) - 64
+        flipped = bitboard.flips(opp, own, sq).bit_count()
+        if flipped:
+            return 2 * (own_count - flipped) - 64
+        return 2 * own_count - 63
+
+    def _solve(self, own, opp, alpha, beta, empties, passed) -> int:
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_budget()
+
+        if empties <= 1:
+            self.evaluations += 1
+            if empties == 0:
+                return 2 * own.bit_count() - 64
+            return self._last_move(own, opp)
+
+        moves = bitboard.legal_moves(own, opp)
+        if not moves:
+            if passed:
+                self.evaluations += 1
+                return own.bit_count() - opp.bit_count()
+            return -self._solve(opp, own, -beta, -alpha, empties, True)
+
+        key = None
+        tt_move = None
+        if empties >= TT_EMPTIES:
+            key = transposition.zobrist(own, opp)
+            self.tt_probes += 1
+            entry = self.tt.probe(key)
+            if entry is not None:
+                self.tt_hits += 1
+                (_, bound, tt_score, tt_move) = entry
+                if bound == transposition.EXACT:
+                    return tt_score
+                if bound == transposition.LOWER and tt_score >= beta:
+                    return tt_score
+                if bound == transposition.UPPER and tt_score <= alpha:
+                    return tt_score
+
+        ordered = self._order(own, opp, moves, empties)
+        if tt_move is not None:
+            for index, (sq, flipped) in enumerate(ordered):
+                if sq == tt_move:
+                    ordered.insert(0, ordered.pop(index))
+                    break
+
+        original_alpha = alpha
+        best = -65
+        best_move = None
+        for index, (sq, flipped) in enumerate(ordered):
+            new_own = opp & ~flipped
+            new_opp = own | flipped | (1 << sq)
+            if best_move is None:
+                score = -self._solve(new_own, new_opp, -beta, -alpha, empties - 1, False)
+            else:
+                # principal variation search, null window proves move is not better
+                score = -self._solve(new_own, new_opp, -alpha - 1, -alpha, empties - 1, False)
+                if alpha < score < beta:
+                    score = -self._solve(new_own, new_opp, -beta, -score, empties - 1, False)
+            if score > best:
+                best = score
+                best_move = sq
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.cutoffs[index] += 1
+                        break
+
+        if key is not None:
+            if best <= original_alpha:
+                bound = transposition.UPPER
+            elif best >= beta:
+                bound = transposition.LOWER
+            else:
+                bound = transposition.EXACT
+            self.tt.store(key, empties, bound, best, best_move)
+        return best
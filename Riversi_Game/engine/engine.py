@@ -0,0 +1,160 @@
+"""Module containing engine choosing moves for the ai
+
+Engine combines opening book, endgame solver and search: book move is played
+when the position is in the book, positions with few empties are solved
+exactly and everything else is searched with iterative deepening.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Optional
+from exceptions.exceptions import BookFormatException, SearchAbortedException
+from model import bitboard
+from engine import endgame
+from engine.book import OpeningBook
+from engine.endgame import EndgameSolver
+from engine.evaluation import PatternEvaluator
+from engine.parallel import ParallelSearcher
+from engine.search import (
+    MAX_DEPTH,
+    Searcher,
+    SearchResult,
+    SearchStatistics,
+    solved_score,
+    WIN_SCORE,
+)
+from engine.transposition import DEFAULT_SIZE_MB, TranspositionTable
+
+DEFAULT_ENDGAME_EMPTIES = 14
+ENDGAME_TIME_SHARE = 0.75  # part of move time solver may use before search takes over
+
+
+class Engine:
+    """Move chooser combining book, endgame solver and search
+
+    Args:
+        searcher (Searcher | ParallelSearcher): midgame search
+        book (OpeningBook | None): opening book, not used if not given
+        endgame_solver (EndgameSolver | None): solver, not used if not given
+        endgame_empties (int): solver is used with this many empties or less
+        endgame_mode (str): endgame.EXACT or endgame.WLD
+    """
+
+    def __init__(
+        self,
+        searcher,
+        book: Optional[OpeningBook] = None,
+        endgame_solver: Optional[EndgameSolver] = None,
+        endgame_empties: int = DEFAULT_ENDGAME_EMPTIES,
+        endgame_mode: str = endgame.EXACT,
+    ):
+        self.searcher = searcher
+        self.book = book
+        self.endgame_solver = endgame_solver
+        self.endgame_empties = endgame_empties
+        self.endgame_mode = endgame_mode
+
+    def close(self):
+        """Function releasing book file and search processes"""
+        if self.book is not None:
+            self.book.close()
+        if isinstance(self.searcher, ParallelSearcher):
+            self.searcher.close()
+
+    def choose_move(
+        self,
+        own: int,
+        opp: int,
+        time_limit: float,
+        max_depth: int = MAX_DEPTH,
+        node_limit: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+        callback: Optional[Callable[[SearchStatistics], None]] = None,
+    ) -> SearchResult:
+        """Function choosing move for side to move
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+            time_limit (float): wall clock budget in seconds
+            max_depth (int): maximal depth of iterative deepening
+            node_limit (int | None): optional node budget of search
+            stop_event (threading.Event | None): event set from another thread
+                to stop thinking early
+            callback (Callable[[SearchStatistics], None] | None): called with
+                statistics of the search as it progresses
+
+        Returns:
+            SearchResult: chosen move with statistics, depth 0 means book move
+        """
+        if self.book is not None:
+            book_move = self.book.lookup(own, opp)
+            if book_move is not None:
+                return SearchResult(book_move, 0, 0, SearchStatistics())
+
+        deadline = time.perf_counter() + time_limit
+        empties = 64 - bitboard.popcount(own | opp)
+        if self.endgame_solver is not None and empties <= self.endgame_empties:
+            try:
+                result = self.endgame_solver.solve(
+                    own, opp, self.endgame_mode, time_limit * ENDGAME_TIME_SHARE, stop_event
+                )
+            except SearchAbortedException:
+                pass
+            else:
+                if self.endgame_mode == endgame.WLD:
+                    result.score *= WIN_SCORE
+                else:
+                    result.score = solved_score(result.score)
+                if callback is not None:
+                    callback(result.statistics)
+                return result
+
+        return self.searcher.iterative_deepening(
+            own,
+            opp,
+            max(0.0, deadline - time.perf_counter()),
+            max_depth,
+            node_limit,
+            stop_event,
+            callback,
+        )
+
+
+def create_engine(
+    weights_file: Optional[str] = None,
+    book_file: Optional[str] = None,
+    workers: int = 1,
+    tt_size_mb: int = DEFAULT_SIZE_MB,
+    endgame_empties: int = DEFAULT_ENDGAME_EMPTIES,
+    endgame_mode: str = endgame.EXACT,
+) -> Engine:
+    """Function building engine with pattern evaluation from optional data files
+
+    Args:
+        weights_file (str | None): evaluation weights, built-in weights are used if missing
+        book_file (str | None): opening book, engine plays without book if missing or invalid
+        workers (int): more than 1 splits search between processes
+        tt_size_mb (int): size of transposition table
+        endgame_empties (int): solver is used with this many empties or less
+        endgame_mode (str): endgame.EXACT or endgame.WLD
+
+    Returns:
+        Engine: engine ready to choose moves
+    """
+    if weights_file is not None and os.path.exists(weights_file):
+        evaluator = PatternEvaluator.load(weights_file)
+    else:
+        evaluator = PatternEvaluator()
+    if workers > 1:
+        searcher = ParallelSearcher(workers, evaluator, tt_size_mb=tt_size_mb)
+    else:
+        searcher = Searcher(evaluator, transposition_table=TranspositionTable(tt_size_mb))
+    book = None
+    if book_file is not None and os.path.exists(book_file):
+        try:
+            book = OpeningBook(book_file)
+        except BookFormatException:
+            book = None
+    return Engine(searcher, book, EndgameSolver(), endgame_empties, endgame_mode)
@@ -0,0 +1,271 @@
+"""Module containing pattern based evaluation function
+
+Position is scored by summing weights of pattern configurations (edges, 3x3
+corners and both main diagonals) plus mobility and frontier terms. Every
+pattern instance is mapped to the same orientation using board symmetries, so
+instances share one weight array. Pattern squares are gathered from bitboards
+with shifts and a multiplication and translated to base-3 index (empty 0,
+own 1, opponent 2) with precomputed lookup table.
+
+Weights live in NumPy arrays. Scalar evaluation used by the search reads
+list copies of them (indexing lists is much faster than indexing arrays
+one element at a time), evaluate_batch scores many positions with array operations.
+"""
+
+import numpy as np
+from model import batch
+from model import bitboard
+
+EDGE_SIZE = 3**8
+CORNER_SIZE = 3**9
+DIAGONAL_SIZE = 3**8
+
+MAIN_DIAGONAL = 0x8040_2010_0804_0201
+ANTI_DIAGONAL = 0x0102_0408_1020_4080
+BYTE_GATHER = 0x0101_0101_0101_0101
+
+# squares of pattern in the orientation shared by every instance, bit i of pattern is EDGE[i]
+EDGE = tuple(range(8))
+CORNER = (0, 1, 2, 8, 9, 10, 16, 17, 18)
+DIAGONAL = tuple(9 * i for i in range(8))
+
+SQUARE_WEIGHTS = (
+    (100, -20, 10, 5, 5, 10, -20, 100),
+    (-20, -50, -2, -2, -2, -2, -50, -20),
+    (10, -2, 1, 1, 1, 1, -2, 10),
+    (5, -2, 1, 0, 0, 1, -2, 5),
+    (5, -2, 1, 0, 0, 1, -2, 5),
+    (10, -2, 1, 1, 1, 1, -2, 10),
+    (-20, -50, -2, -2, -2, -2, -50, -20),
+    (100, -20, 10, 5, 5, 10, -20, 100),
+)
+MOBILITY_WEIGHT = 8
+FRONTIER_WEIGHT = -4
+
+# base-3 value of binary number, BINARY_TO_TERNARY[0b101] == 3**0 + 3**2
+BINARY_TO_TERNARY = tuple(
+    sum(3**i for i in range(10) if value >> i & 1) for value in range(1 << 10)
+)
+_TERNARY = np.array(BINARY_TO_TERNARY, dtype=np.int64)
+
+
+def _corner_bits(bits: int) -> int:
+    return (bits & 0x7) | ((bits >> 5) & 0x38) | ((bits >> 10) & 0x1C0)
+
+
+def _pattern_coverage() -> list:
+    """Number of pattern instances every square belongs to"""
+    coverage = [0] * 64
+    for x in range(8):
+        for sq in (x, 56 + x, 8 * x, 8 * x + 7, 9 * x, 7 * x + 7):
+            coverage[sq] += 1
+    for sq in CORNER:
+        (x, y) = bitboard.coordinates(sq)
+        for corner_x, corner_y in ((x, y), (x, 7 - y), (7 - x, y), (7 - x, 7 - y)):
+            coverage[bitboard.square(corner_x, corner_y)] += 1
+    return coverage
+
+
+def _initial_weights(squares: tuple) -> np.ndarray:
+    """Pattern weights equal to square weights of covered squares,
+    divided by number of patterns covering the square"""
+    coverage = _pattern_coverage()
+    values = np.array(
+        [
+            SQUARE_WEIGHTS[sq >> 3][sq & 7] / coverage[sq]
+            for sq in squares
+        ],
+        dtype=np.float64,
+    )
+    indexes = np.arange(3 ** len(squares))
+    digits = (indexes[:, None] // (3 ** np.arange(len(squares)))[None, :]) % 3
+    return ((digits == 1) * values - (digits == 2) * values).sum(axis=1)
+
+
+class PatternEvaluator:
+    """Pattern based evaluation function, instance is called with (own, opp) bitboards
+
+    Args:
+        edge (np.ndarray | None): weights of edge configurations (3**8)
+        corner (np.ndarray | None): weights of 3x3 corner configurations (3**9)
+        diagonal (np.ndarray | None): weights of diagonal configurations (3**8)
+        features (np.ndarray | None): weights of mobility and frontier difference
+    """
+
+    def __init__(self, edge=None, corner=None, diagonal=None, features=None):
+        self.edge = _initial_weights(EDGE) if edge is None else np.asarray(edge, np.float64)
+        self.corner = (
+            _initial_weights(CORNER) if corner is None else np.asarray(corner, np.float64)
+        )
+        self.diagonal = (
+            _initial_weights(DIAGONAL)
+            if diagonal is None
+            else np.asarray(diagonal, np.float64)
+        )
+        self.features = (
+            np.array([MOBILITY_WEIGHT, FRONTIER_WEIGHT], dtype=np.float64)
+            if features is None
+            else np.asarray(features, np.float64)
+        )
+        self.refresh()
+
+    def refresh(self):
+        """Function copying weight arrays to lists read by scalar evaluation,
+        has to be called after arrays are modified in place"""
+        self._edge = self.edge.tolist()
+        self._corner = self.corner.tolist()
+        self._diagonal = self.diagonal.tolist()
+        (self._mobility, self._frontier) = self.features.tolist()
+
+    def save(self, path: str):
+        """Function saving weights to .npz file
+
+        Args:
+            path (str): file path
+        """
+        np.savez(
+            path,
+            edge=self.edge,
+            corner=self.corner,
+            diagonal=self.diagonal,
+            features=self.features,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "PatternEvaluator":
+        """Function loading weights saved by save
+
+        Args:
+            path (str): file path
+
+        Returns:
+            PatternEvaluator: evaluator with loaded weights
+        """
+        with np.load(path) as data:
+            return cls(data["edge"], data["corner"], data["diagonal"], data["features"])
+
+    def __getstate__(self) -> dict:
+        return {
+            "edge": self.edge,
+            "corner": self.corner,
+            "diagonal": self.diagonal,
+            "features": self.features,
+        }
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.refresh()
+
+    def __call__(self, own: int, opp: int) -> int:
+        """Function scoring position for side to move
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+
+        Returns:
+            int: score of position
+        """
+        ternary = BINARY_TO_TERNARY
+        edge = self._edge
+        corner = self._corner
+        diagonal = self._diagonal
+
+        own_t = bitboard.transpose(own)
+        opp_t = bitboard.transpose(opp)
+        score = (
+            edge[ternary[own & 0xFF] + 2 * ternary[opp & 0xFF]]
+            + edge[ternary[own >> 56] + 2 * ternary[opp >> 56]]
+            + edge[ternary[own_t & 0xFF] + 2 * ternary[opp_t & 0xFF]]
+            + edge[ternary[own_t >> 56] + 2 * ternary[opp_t >> 56]]
+        )
+
+        own_v = bitboard.flip_vertical(own)
+        opp_v = bitboard.flip_vertical(opp)
+        own_h = bitboard.mirror_horizontal(own)
+        opp_h = bitboard.mirror_horizontal(opp)
+        own_vh = bitboard.flip_vertical(own_h)
+        opp_vh = bitboard.flip_vertical(opp_h)
+        score += (
+            corner[ternary[_corner_bits(own)] + 2 * ternary[_corner_bits(opp)]]
+            + corner[ternary[_corner_bits(own_h)] + 2 * ternary[_corner_bits(opp_h)]]
+            + corner[ternary[_corner_bits(own_v)] + 2 * ternary[_corner_bits(opp_v)]]
+            + corner[ternary[_corner_bits(own_vh)] + 2 * ternary[_corner_bits(opp_vh)]]
+        )
+
+        score += diagonal[
+            ternary[((own & MAIN_DIAGONAL) * BYTE_GATHER >> 56) & 0xFF]
+            + 2 * ternary[((opp & MAIN_DIAGONAL) * BYTE_GATHER >> 56) & 0xFF]
+        ] + diagonal[
+            ternary[((own & ANTI_DIAGONAL) * BYTE_GATHER >> 56) & 0xFF]
+            + 2 * ternary[((opp & ANTI_DIAGONAL) * BYTE_GATHER >> 56) & 0xFF]
+        ]
+
+        mobility = (
+            bitboard.legal_moves(own, opp).bit_count()
+            - bitboard.legal_moves(opp, own).bit_count()
+        )
+        frontier_squares = bitboard.neighbours(~(own | opp) & bitboard.FULL_MASK)
+        frontier = (own & frontier_squares).bit_count() - (opp & frontier_squares).bit_count()
+        score += self._mobility * mobility + self._frontier * frontier
+        return round(score)
+
+    def evaluate_batch(self, own, opp) -> np.ndarray:
+        """Function scoring many positions at once
+
+        Args:
+            own (np.ndarray | Iterable[int]): bitboards of side to move
+            opp (np.ndarray | Iterable[int]): bitboards of opponent
+
+        Returns:
+            np.ndarray: int64 scores, equal to calling evaluator on every position
+        """
+        own = batch.as_bitboards(own)
+        opp = batch.as_bitboards(opp)
+        byte = np.uint64(0xFF)
+        top = np.uint64(56)
+
+        def index(own_bits, opp_bits):
+            return _TERNARY[own_bits.astype(np.int64)] + 2 * _TERNARY[opp_bits.astype(np.int64)]
+
+        def corner_bits(bits):
+            return (
+                (bits & np.uint64(0x7))
+                | ((bits >> np.uint64(5)) & np.uint64(0x38))
+                | ((bits >> np.uint64(10)) & np.uint64(0x1C0))
+            )
+
+        def diagonal_bits(bits, mask):
+            return ((bits & np.uint64(mask)) * np.uint64(BYTE_GATHER)) >> top
+
+        own_t = batch.transpose(own)
+        opp_t = batch.transpose(opp)
+        score = (
+            self.edge[index(own & byte, opp & byte)]
+            + self.edge[index(own >> top, opp >> top)]
+            + self.edge[index(own_t & byte, opp_t & byte)]
+            + self.edge[index(own_t >> top, opp_t >> top)]
+        )
+
+        own_h = batch.mirror_horizontal(own)
+        opp_h = batch.mirror_horizontal(opp)
+        for own_variant, opp_variant in (
+            (own, opp),
+            (own_h, opp_h),
+            (batch.flip_vertical(own), batch.flip_vertical(opp)),
+            (batch.flip_vertical(own_h), batch.flip_vertical(opp_h)),
+        ):
+            score += self.corner[index(corner_bits(own_variant), corner_bits(opp_variant))]
+
+        for mask in (MAIN_DIAGONAL, ANTI_DIAGONAL):
+            score += self.diagonal[index(diagonal_bits(own, mask), diagonal_bits(opp, mask))]
+
+        mobility = batch.popcount(batch.legal_moves(own, opp)) - batch.popcount(
+            batch.legal_moves(opp, own)
+        )
+        frontier_squares = batch.neighbours(~(own | opp))
+        frontier = batch.popcount(own & frontier_squares) - batch.popcount(
+            opp & frontier_squares
+        )
+        score += self.features[0] * mobility + self.features[1] * frontier
+        return np.round(score).astype(np.int64)
@@ -0,0 +1,106 @@
+"""Module containing move ordering policies used by the search
+
+Alpha beta prunes the most when the best move is searched first, policies here
+decide in which order legal moves of a node are tried. Searcher accepts any
+object implementing MoveOrdering, so policies can be benchmarked against each other.
+"""
+
+from typing import Optional
+from model import bitboard
+
+CORNERS = (1 << 0) | (1 << 7) | (1 << 56) | (1 << 63)
+X_SQUARES = (1 << 9) | (1 << 14) | (1 << 49) | (1 << 54)
+C_SQUARES = (
+    (1 << 1) | (1 << 8) | (1 << 6) | (1 << 15)
+    | (1 << 48) | (1 << 57) | (1 << 55) | (1 << 62)
+)
+
+MAX_PLY = 64
+HISTORY_LIMIT = 1 << 20
+
+_TT_MOVE_BONUS = 1 << 30
+_CORNER_BONUS = 1 << 28
+_KILLER_BONUS = 1 << 26
+_X_SQUARE_PENALTY = 1 << 28
+_C_SQUARE_PENALTY = 1 << 27
+
+
+class MoveOrdering:
+    """Base move ordering policy, tries moves in row-major scan order
+    with only the transposition table move moved to the front
+    """
+
+    def order(self, moves: int, tt_move: Optional[int], ply: int) -> list:
+        """Function ordering legal moves of a node
+
+        Args:
+            moves (int): bitboard of legal moves
+            tt_move (int | None): best move stored in transposition table
+            ply (int): distance from root of the search
+
+        Returns:
+            list[int]: bit indexes of moves in order they should be searched
+        """
+        ordered = list(bitboard.iter_squares(moves))
+        if tt_move is not None and moves >> tt_move & 1:
+            ordered.remove(tt_move)
+            ordered.insert(0, tt_move)
+        return ordered
+
+    def record_cutoff(self, sq: int, depth: int, ply: int):
+        """Function informing policy that move caused beta cutoff
+
+        Args:
+            sq (int): bit index of move
+            depth (int): remaining depth of the node
+            ply (int): distance from root of the search
+        """
+
+    def new_search(self):
+        """Function called before every root search"""
+
+
+class HeuristicOrdering(MoveOrdering):
+    """Move ordering using transposition table move, corners,
+    killer moves and history table, with X and C squares tried last
+    """
+
+    def __init__(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+        self.history = [0] * 64
+
+    def order(self, moves: int, tt_move: Optional[int], ply: int) -> list:
+        killers = self.killers[min(ply, MAX_PLY)]
+        history = self.history
+        keyed = []
+        for sq in bitboard.iter_squares(moves):
+            bit = 1 << sq
+            key = history[sq]
+            if sq == tt_move:
+                key += _TT_MOVE_BONUS
+            elif bit & CORNERS:
+                key += _CORNER_BONUS
+            elif bit & X_SQUARES:
+                key -= _X_SQUARE_PENALTY
+            elif bit & C_SQUARES:
+                key -= _C_SQUARE_PENALTY
+            elif sq == killers[0]:
+                key += _KILLER_BONUS * 2
+            elif sq == killers[1]:
+                key += _KILLER_BONUS
+            keyed.append((key, sq))
+        keyed.sort(reverse=True)
+        return [sq for _, sq in keyed]
+
+    def record_cutoff(self, sq: int, depth: int, ply: int):
+        killers = self.killers[min(ply, MAX_PLY)]
+        if killers[0] != sq:
+            killers[1] = killers[0]
+            killers[0] = sq
+        self.history[sq] += depth * depth
+        if self.history[sq] > HISTORY_LIMIT:
+            self.history = [value // 2 for value in self.history]
+
+    def new_search(self):
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+        self.history = [value // 2 for value in self.history]
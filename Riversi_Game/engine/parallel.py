@@ -0,0 +1,341 @@
+"""Module containing parallel search distributing root moves over a process pool
+
+Root splitting in Young Brothers Wait style: the first (best ordered) root move
+is searched alone to get a bound, then the remaining moves are searched in
+parallel with a null window around that bound and only the ones failing high
+are searched again with open window. Every worker process keeps its own Searcher and
+transposition table between tasks. With one worker, or when a pool cannot be
+started, everything runs in the calling process exactly like Searcher.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+from exceptions.exceptions import SearchAbortedException
+from model import bitboard
+from engine.search import (
+    INFINITY,
+    MAX_DEPTH,
+    IterationStatistics,
+    SearchResult,
+    SearchStatistics,
+    Searcher,
+    disc_difference,
+)
+from engine.transposition import DEFAULT_SIZE_MB, TranspositionTable, zobrist
+
+STOP_POLL_INTERVAL = 0.02  # seconds between checks of stop event while waiting for workers
+
+_worker_searcher: Optional[Searcher] = None
+_worker_search_id: Optional[int] = None
+
+
+def _init_worker(evaluate: Callable[[int, int], int], tt_size_mb: float):
+    """Creates Searcher of worker process"""
+    global _worker_searcher, _worker_search_id  # pylint: disable=global-statement
+    _worker_searcher = Searcher(evaluate, TranspositionTable(tt_size_mb))
+    _worker_search_id = None
+
+
+def _search_child(own, opp, depth, alpha, beta, time_limit, search_id) -> tuple:
+    """Searches position in worker process
+
+    First task of every root search starts new generation of transposition
+    table and resets killer moves, like Searcher does before a root search.
+
+    Returns:
+        tuple: (score or None when time ran out, SearchStatistics of the worker)
+    """
+    global _worker_search_id  # pylint: disable=global-statement
+    searcher = _worker_searcher
+    if search_id != _worker_search_id:
+        _worker_search_id = search_id
+        searcher.tt.new_search()
+        searcher.ordering.new_search()
+    searcher.reset_statistics()
+    try:
+        score = searcher.negamax(own, opp, depth, alpha, beta, time_limit)
+    except SearchAbortedException:
+        return (None, searcher.statistics())
+    return (score, searcher.statistics())
+
+
+def default_workers() -> int:
+    """Number of workers used when none is given
+
+    Returns:
+        int: number of cpu cores
+    """
+    return os.cpu_count() or 1
+
+
+class ParallelSearcher:
+    """Search splitting root moves between worker processes
+
+    Has the same search and iterative_deepening interface as Searcher.
+
+    Args:
+        workers (int | None): number of worker processes, cpu count if not given,
+            1 means single process search
+        evaluate (Callable[[int, int], int]): static evaluation function,
+            has to be picklable (module level function or PatternEvaluator)
+        tt_size_mb (float): transposition table budget of every process
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        evaluate: Callable[[int, int], int] = disc_difference,
+        tt_size_mb: float = DEFAULT_SIZE_MB,
+    ):
+        self.workers = workers if workers is not None else default_workers()
+        self.evaluate = evaluate
+        self.tt_size_mb = tt_size_mb
+        self.local = Searcher(evaluate, TranspositionTable(tt_size_mb))
+        self.nodes = 0
+        self.totals = SearchStatistics()
+        self.search_id = 0  # tells workers when a new root search starts
+        self.pool: Optional[ProcessPoolExecutor] = None
+        if self.workers > 1:
+            try:
+                self.pool = ProcessPoolExecutor(
+                    self.workers,
+                    initializer=_init_worker,
+                    initargs=(evaluate, tt_size_mb),
+                )
+            except (OSError, NotImplementedError, ImportError):
+                self.pool = None
+
+    def close(self):
+        """Function shutting down worker processes"""
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def search(self, own: int, opp: int, depth: int) -> SearchResult:
+        """Function finding best move for side to move
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+            depth (int): depth of the decision tree
+
+        Returns:
+            SearchResult: best move with its score
+        """
+        if self.pool is None:
+            result = self.local.search(own, opp, depth)
+            self.nodes = self.local.nodes
+            return result
+
+        self._reset_statistics()
+        start = time.perf_counter()
+        try:
+            # shallow local search orders root moves, like previous iteration does in
+            # iterative deepening, so the eldest brother is rarely refuted
+            self.totals.add(self.local.search(own, opp, max(1, depth - 2)).statistics)
+            result = self._search_root(own, opp, depth, self._root_order(own, opp), None, None)
+        except BrokenProcessPool:
+            self.pool = None
+            return self.search(own, opp, depth)
+        seconds = time.perf_counter() - start
+        iteration = IterationStatistics(depth, result.move, result.score, self.nodes, seconds)
+        result.statistics = self._statistics(depth, seconds, [iteration])
+        return result
+
+    def iterative_deepening(
+        self,
+        own: int,
+        opp: int,
+        time_limit: float,
+        max_depth: int = MAX_DEPTH,
+        node_limit: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+        callback: Optional[Callable[[SearchStatistics], None]] = None,
+    ) -> SearchResult:
+        """Function searching with increasing depth until time or node budget runs out
+
+        Node budget is only checked between iterations when searching in parallel.
+        Workers busy when stop is requested finish at their time budget at the latest.
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+            time_limit (float): wall clock budget in seconds
+            max_depth (int): depth at which search stops even with budget left
+            node_limit (int | None): optional budget of searched nodes
+            stop_event (threading.Event | None): event set from another thread
+                to stop the search early
+            callback (Callable[[SearchStatistics], None] | None): called with
+                statistics so far after every completed iteration
+
+        Returns:
+            SearchResult: result of the last completed iteration with statistics of the search
+        """
+        if self.pool is None:
+            result = self.local.iterative_deepening(
+                own, opp, time_limit, max_depth, node_limit, stop_event, callback
+            )
+            self.nodes = self.local.nodes
+            return result
+
+        self._reset_statistics()
+        start = time.perf_counter()
+        deadline = start + time_limit
+        empties = 64 - bitboard.popcount(own | opp)
+        result = self.local.search(own, opp, 1)
+        self.totals.add(result.statistics)
+        self.nodes = self.totals.nodes
+        if result.move is None:
+            return result
+        iterations = list(result.statistics.iterations)
+        if callback is not None:
+            callback(self._statistics(1, time.perf_counter() - start, iterations))
+
+        order = self._root_order(own, opp)
+        for depth in range(2, min(max_depth, empties) + 1):
+            if time.perf_counter() >= deadline or (
+                stop_event is not None and stop_event.is_set()
+            ):
+                break
+            if node_limit is not None and self.nodes >= node_limit:
+                break
+            try:
+                result = self._search_root(own, opp, depth, order, deadline, stop_event)
+            except SearchAbortedException:
+                break
+            except BrokenProcessPool:
+                self.pool = None
+                break
+            order.remove(result.move)
+            order.insert(0, result.move)
+            seconds = time.perf_counter() - start
+            iterations.append(
+                IterationStatistics(
+                    depth,
+                    result.move,
+                    result.score,
+                    self.nodes - sum(iteration.nodes for iteration in iterations),
+                    seconds - sum(iteration.seconds for iteration in iterations),
+                )
+            )
+            if callback is not None:
+                callback(self._statistics(depth, seconds, iterations))
+        result.statistics = self._statistics(
+            result.depth, time.perf_counter() - start, iterations
+        )
+        return result
+
+    def _reset_statistics(self):
+        self.search_id += 1
+        self.nodes = 0
+        self.totals = SearchStatistics()
+
+    def _statistics(self, depth: int, seconds: float, iterations: list) -> SearchStatistics:
+        """Copy of counters summed over all processes"""
+        statistics = SearchStatistics(depth=depth, seconds=seconds, iterations=list(iterations))
+        statistics.add(self.totals)
+        return statistics
+
+    def _root_order(self, own: int, opp: int) -> list:
+        entry = self.local.tt.probe(zobrist(own, opp))
+        tt_move = entry[3] if entry is not None else None
+        return self.local.ordering.order(bitboard.legal_moves(own, opp), tt_move, 0)
+
+    def _submit(self, own, opp, sq, depth, alpha, beta, deadline):
+        flipped = bitboard.flips(own, opp, sq)
+        time_limit = None
+        if deadline is not None:
+            time_limit = max(0.0, deadline - time.perf_counter())
+        return self.pool.submit(
+            _search_child,
+            opp & ~flipped,
+            own | flipped | (1 << sq),
+            depth - 1,
+            -beta,
+            -alpha,
+            time_limit,
+            self.search_id,
+        )
+
+    @staticmethod
+    def _wait(pending: set, stop_event: Optional[threading.Event]) -> set:
+        """Waits until some of pending futures are done, checking stop event meanwhile
+
+        Raises:
+            SearchAbortedException: when stop is requested
+
+        Returns:
+            set: finished futures
+        """
+        while True:
+            (done, _) = wait(pending, timeout=STOP_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            if stop_event is not None and stop_event.is_set():
+                for future in pending:
+                    future.cancel()
+                raise SearchAbortedException("Search stopped")
+            if done:
+                return done
+
+    def _collect(self, future) -> int:
+        (score, statistics) = future.result()
+        self.totals.add(statistics)
+        self.nodes = self.totals.nodes
+        if score is None:
+            raise SearchAbortedException("Time budget exhausted")
+        return -score
+
+    def _search_root(self, own, opp, depth, order, deadline, stop_event) -> SearchResult:
+        if not order:
+            result = self.local.search(own, opp, depth)
+            self.totals.add(result.statistics)
+            self.nodes = self.totals.nodes
+            return result
+
+        # eldest brother alone, gives bound for the rest
+        best_move = order[0]
+        eldest = self._submit(own, opp, best_move, depth, -INFINITY, INFINITY, deadline)
+        alpha = self._collect(self._wait({eldest}, stop_event).pop())
+
+        # younger brothers only have to prove they are not better than alpha,
+        # the ones failing high are searched again with open window
+        futures = {
+            self._submit(own, opp, sq, depth, alpha, alpha + 1, deadline): index
+            for index, sq in enumerate(order[1:], start=1)
+        }
+        scores = {}
+        pending = set(futures)
+        try:
+            while pending:
+                for future in self._wait(pending, stop_event):
+                    pending.remove(future)
+                    index = futures.pop(future)
+                    score = self._collect(future)
+                    if score > alpha and index not in scores:
+                        research = self._submit(
+                            own, opp, order[index], depth, alpha, INFINITY, deadline
+                        )
+                        futures[research] = index
+                        pending.add(research)
+                    scores[index] = score
+        finally:
+            for future in pending:
+                future.cancel()
+
+        # ties are resolved by root order, so result does not depend on which worker finished first
+        best_score = alpha
+        for index in sorted(scores):
+            if scores[index] > best_score:
+                best_score = scores[index]
+                best_move = order[index]
+        return SearchResult(best_move, best_score, depth)
+
@@ -0,0 +1,474 @@
+"""Module containing game tree search used by the ai
+
+Every function takes position explicitly as bitboards of the side to move (own)
+and its opponent (opp), so search does not depend on Controller or tkinter
+and can be run from threads, processes, tools and benchmarks.
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from exceptions.exceptions import SearchAbortedException
+from model import bitboard
+from engine import transposition
+from engine.transposition import TranspositionTable
+from engine.ordering import HeuristicOrdering, MoveOrdering
+
+WIN_SCORE = 10000
+INFINITY = 1_000_000
+MAX_DEPTH = 60
+CHECK_INTERVAL = 1024  # nodes between checks of time and node budget
+MAX_MOVES = 64  # more than legal moves of any position, size of cutoff counters
+
+
+def disc_difference(own: int, opp: int) -> int:
+    """Simple evaluation counting disks of side to move minus opponent's disks
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+
+    Returns:
+        int: score of position for side to move
+    """
+    return bitboard.popcount(own) - bitboard.popcount(opp)
+
+
+def final_score(own: int, opp: int) -> int:
+    """Score of finished game, any win is better than any evaluation
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+
+    Returns:
+        int: score of finished game for side to move
+    """
+    return solved_score(bitboard.popcount(own) - bitboard.popcount(opp))
+
+
+def solved_score(difference: int) -> int:
+    """Score of position with known final disc difference
+
+    Args:
+        difference (int): final disc difference for side to move
+
+    Returns:
+        int: score for side to move on the scale used by search
+    """
+    if difference > 0:
+        return WIN_SCORE + difference
+    if difference < 0:
+        return -WIN_SCORE + difference
+    return 0
+
+
+@dataclass
+class IterationStatistics:
+    """Completed iteration of iterative deepening, nodes and seconds of this iteration only"""
+
+    depth: int
+    move: Optional[int]
+    score: int
+    nodes: int
+    seconds: float
+
+
+@dataclass
+class SearchStatistics:
+    """Counters of one search
+
+    Args:
+        nodes (int): visited nodes, aborted iteration included
+        evaluations (int): static evaluations of leaves
+        tt_probes (int): transposition table lookups
+        tt_hits (int): lookups which found the position
+        cutoffs (list[int]): beta cutoffs by index of the move in search order
+        depth (int): depth of the last completed iteration
+        seconds (float): wall clock time of the search
+        iterations (list[IterationStatistics]): completed iterations
+    """
+
+    nodes: int = 0
+    evaluations: int = 0
+    tt_probes: int = 0
+    tt_hits: int = 0
+    cutoffs: list = field(default_factory=lambda: [0] * MAX_MOVES)
+    depth: int = 0
+    seconds: float = 0.0
+    iterations: list = field(default_factory=list)
+
+    @property
+    def nps(self) -> float:
+        """Nodes per second"""
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    @property
+    def first_move_cutoffs(self) -> float:
+        """Part of beta cutoffs caused by the first searched move, measures move ordering"""
+        total = sum(self.cutoffs)
+        return self.cutoffs[0] / total if total else 0.0
+
+    def add(self, other: "SearchStatistics"):
+        """Function adding counters of another search, e.g. of a worker process
+
+        Args:
+            other (SearchStatistics): counters added to this object
+        """
+        self.nodes += other.nodes
+        self.evaluations += other.evaluations
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.cutoffs = [a + b for a, b in zip(self.cutoffs, other.cutoffs)]
+
+    def summary(self) -> str:
+        """Function formatting statistics on one line
+
+        Returns:
+            str: name value pairs
+        """
+        return (
+            f"depth {self.depth} nodes {self.nodes} nps {self.nps:.0f} "
+            f"evals {self.evaluations} tthits {self.tt_hits}/{self.tt_probes} "
+            f"cutoffs {sum(self.cutoffs)} first {self.first_move_cutoffs:.2f} "
+            f"time {self.seconds:.3f}"
+        )
+
+
+@dataclass
+class SearchResult:
+    """Result of root search
+
+    Args:
+        move (int | None): bit index of best move, None if side to move has to pass
+        score (int): score of best move for side to move
+        depth (int): depth the result was searched to
+        statistics (SearchStatistics | None): counters of the search which found the result
+    """
+
+    move: Optional[int]
+    score: int
+    depth: int
+    statistics: Optional[SearchStatistics] = None
+
+
+class Searcher:
+    """Negamax alpha beta search with transposition table
+
+    Args:
+        evaluate (Callable[[int, int], int]): static evaluation of (own, opp)
+            position from the perspective of side to move
+        transposition_table (TranspositionTable | None): table shared between
+            searches, new table of default size is created if not given
+        ordering (MoveOrdering | None): move ordering policy,
+            HeuristicOrdering is used if not given
+    """
+
+    def __init__(
+        self,
+        evaluate: Callable[[int, int], int] = disc_difference,
+        transposition_table: Optional[TranspositionTable] = None,
+        ordering: Optional[MoveOrdering] = None,
+    ):
+        self.evaluate = evaluate
+        if transposition_table is None:
+            transposition_table = TranspositionTable()
+        self.tt = transposition_table
+        if ordering is None:
+            ordering = HeuristicOrdering()
+        self.ordering = ordering
+        self.nodes = 0
+        self.evaluations = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs = [0] * MAX_MOVES
+        self._deadline: Optional[float] = None
+        self._node_limit: Optional[int] = None
+        self._stop_event: Optional[threading.Event] = None
+        self._next_check = CHECK_INTERVAL
+
+    def search(self, own: int, opp: int, depth: int) -> SearchResult:
+        """Function finding best move for side to move
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+            depth (int): depth of the decision tree
+
+        Returns:
+            SearchResult: best move with its score
+        """
+        self.tt.new_search()
+        self.ordering.new_search()
+        self.reset_statistics()
+        self._deadline = None
+        self._node_limit = None
+        start = time.perf_counter()
+        result = self._search_root(own, opp, depth)
+        seconds = time.perf_counter() - start
+        iteration = IterationStatistics(depth, result.move, result.score, self.nodes, seconds)
+        result.statistics = self.statistics(depth, seconds, [iteration])
+        return result
+
+    def iterative_deepening(
+        self,
+        own: int,
+        opp: int,
+        time_limit: float,
+        max_depth: int = MAX_DEPTH,
+        node_limit: Optional[int] = None,
+        stop_event: Optional[threading.Event] = None,
+        callback: Optional[Callable[[SearchStatistics], None]] = None,
+    ) -> SearchResult:
+        """Function searching with increasing depth until time or node budget runs out
+
+        Depth 1 is always completed, so a move is returned even with tiny budget
+        or when stop was requested before the search started.
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+            time_limit (float): wall clock budget in seconds
+            max_depth (int): depth at which search stops even with budget left
+            node_limit (int | None): optional budget of searched nodes
+            stop_event (threading.Event | None): event set from another thread
+                to stop the search early
+            callback (Callable[[SearchStatistics], None] | None): called with
+                statistics so far after every completed iteration
+
+        Returns:
+            SearchResult: result of the last completed iteration with statistics of the search
+        """
+        self.tt.new_search()
+        self.ordering.new_search()
+        self.reset_statistics()
+        self._deadline = None
+        self._node_limit = None
+        start = time.perf_counter()
+        deadline = start + time_limit
+        empties = 64 - bitboard.popcount(own | opp)
+        iterations = []
+
+        result = self._search_root(own, opp, 1)
+        self._record_iteration(result, iterations, start, callback)
+        for depth in range(2, min(max_depth, empties) + 1):
+            if time.perf_counter() >= deadline or (
+                stop_event is not None and stop_event.is_set()
+            ):
+                break
+            self._deadline = deadline
+            self._node_limit = node_limit
+            self._stop_event = stop_event
+            self._next_check = self.nodes + CHECK_INTERVAL
+            try:
+                result = self._search_root(own, opp, depth)
+            except SearchAbortedException:
+                break
+            self._record_iteration(result, iterations, start, callback)
+        self._deadline = None
+        self._node_limit = None
+        self._stop_event = None
+        result.statistics = self.statistics(
+            result.depth, time.perf_counter() - start, iterations
+        )
+        return result
+
+    def reset_statistics(self):
+        """Function zeroing counters of the search statistics"""
+        self.nodes = 0
+        self.evaluations = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.cutoffs = [0] * MAX_MOVES
+
+    def statistics(
+        self, depth: int = 0, seconds: float = 0.0, iterations: Optional[list] = None
+    ) -> SearchStatistics:
+        """Function collecting counters since the last reset
+
+        Args:
+            depth (int): depth reached by the search
+            seconds (float): duration of the search
+            iterations (list[IterationStatistics] | None): completed iterations
+
+        Returns:
+            SearchStatistics: copy of the counters
+        """
+        return SearchStatistics(
+            self.nodes,
+            self.evaluations,
+            self.tt_probes,
+            self.tt_hits,
+            list(self.cutoffs),
+            depth,
+            seconds,
+            list(iterations or []),
+        )
+
+    def _record_iteration(self, result, iterations, start, callback):
+        """Appends statistics of completed iteration and passes them to callback"""
+        seconds = time.perf_counter() - start
+        nodes = self.nodes - sum(iteration.nodes for iteration in iterations)
+        elapsed = seconds - sum(iteration.seconds for iteration in iterations)
+        iterations.append(
+            IterationStatistics(result.depth, result.move, result.score, nodes, elapsed)
+        )
+        if callback is not None:
+            callback(self.statistics(result.depth, seconds, iterations))
+
+    def _search_root(self, own: int, opp: int, depth: int) -> SearchResult:
+        key, mirror = transposition.zobrist_pair(own, opp)
+        moves = bitboard.legal_moves(own, opp)
+        if not moves:
+            score = self._negamax(own, opp, depth, -INFINITY, INFINITY, key, mirror, 0)
+            return SearchResult(None, score, depth)
+
+        entry = self.tt.probe(key)
+        tt_move = entry[3] if entry is not None else None
+        alpha = -INFINITY
+        best_move = None
+        for sq in self.ordering.order(moves, tt_move, 0):
+            flipped = bitboard.flips(own, opp, sq)
+            child_key, child_mirror = transposition.update_after_move(key, mirror, sq, flipped)
+            score = -self._negamax(
+                opp & ~flipped,
+                own | flipped | (1 << sq),
+                depth - 1,
+                -INFINITY,
+                -alpha,
+                child_key,
+                child_mirror,
+                1,
+            )
+            if best_move is None or score > alpha:
+                alpha = score
+                best_move = sq
+        self.tt.store(key, depth, transposition.EXACT, alpha, best_move)
+        return SearchResult(best_move, alpha, depth)
+
+    def negamax(
+        self,
+        own: int,
+        opp: int,
+        depth: int,
+        alpha: int,
+        beta: int,
+        time_limit: Optional[float] = None,
+    ) -> int:
+        """Negamax function using alpha beta pruning
+
+        Args:
+            own (int): bitboard of side to move
+            opp (int): bitboard of opponent
+            depth (int): remaining depth of the decision tree
+            alpha (int): minimum score side to move is assured of
+            beta (int): maximum score opponent lets side to move reach
+            time_limit (float | None): optional wall clock budget in seconds
+
+        Raises:
+            SearchAbortedException: when time_limit runs out
+
+        Returns:
+            int: score of position for side to move
+        """
+        key, mirror = transposition.zobrist_pair(own, opp)
+        if time_limit is None:
+            return self._negamax(own, opp, depth, alpha, beta, key, mirror, 0)
+
+        self._deadline = time.perf_counter() + time_limit
+        self._next_check = self.nodes + CHECK_INTERVAL
+        try:
+            return self._negamax(own, opp, depth, alpha, beta, key, mirror, 0)
+        finally:
+            self._deadline = None
+
+    def _check_budget(self):
+        """Raises SearchAbortedException when time or node budget is exhausted or stop was requested"""
+        self._next_check = self.nodes + CHECK_INTERVAL
+        if self._node_limit is not None and self.nodes >= self._node_limit:
+            raise SearchAbortedException("Node budget exhausted")
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchAbortedException("Time budget exhausted")
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise SearchAbortedException("Search stopped")
+
+    def _negamax(self, own, opp, depth, alpha, beta, key, mirror, ply) -> int:
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_budget()
+
+        moves = bitboard.legal_moves(own, opp)
+        if not moves:
+            if not bitboard.legal_moves(opp, own):
+                return final_score(own, opp)
+            return -self._negamax(opp, own, depth, -beta, -alpha, mirror, key, ply + 1)
+
+        if depth <= 0:
+            self.evaluations += 1
+            return self.evaluate(own, opp)
+
+        tt_move = None
+        self.tt_probes += 1
+        entry = self.tt.probe(key)
+        if entry is not None:
+            self.tt_hits += 1
+            (tt_depth, bound, tt_score, tt_move) = entry
+            if tt_depth >= depth:
+                if bound == transposition.EXACT:
+                    return tt_score
+                if bound == transposition.LOWER and tt_score >= beta:
+                    return tt_score
+                if bound == transposition.UPPER and tt_score <= alpha:
+                    return tt_score
+
+        original_alpha = alpha
+        best = -INFINITY
+        best_move = None
+        for index, sq in enumerate(self.ordering.order(moves, tt_move, ply)):
+            flipped = bitboard.flips(own, opp, sq)
+            child_key, child_mirror = transposition.update_after_move(key, mirror, sq, flipped)
+            score = -self._negamax(
+                opp & ~flipped,
+                own | flipped | (1 << sq),
+                depth - 1,
+                -beta,
+                -alpha,
+                child_key,
+                child_mirror,
+                ply + 1,
+            )
+            if score > best:
+                best = score
+                best_move = sq
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.ordering.record_cutoff(sq, depth, ply)
+                        self.cutoffs[index] += 1
+                        break
+
+        if best <= original_alpha:
+            bound = transposition.UPPER
+        elif best >= beta:
+            bound = transposition.LOWER
+        else:
+            bound = transposition.EXACT
+        self.tt.store(key, depth, bound, best, best_move)
+        return best
+
+
+def search(own: int, opp: int, depth: int, evaluate=disc_difference) -> SearchResult:
+    """Function finding best move for side to move with a fresh Searcher
+    and transposition table
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+        depth (int): depth of the decision tree
+        evaluate (Callable[[int, int], int]): static evaluation function
+
+    Returns:
+        SearchResult: best move with its score
+    """
+    return Searcher(evaluate).search(own, opp, depth)
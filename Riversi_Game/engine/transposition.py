@@ -0,0 +1,212 @@
+"""Module containing Zobrist hashing and transposition table used by the search
+
+Hash is relative to the side to move: key = Z(own, OWN_KEYS) ^ Z(opp, OPP_KEYS).
+Search keeps key of the position and its mirror (own and opp swapped),
+so making a move is a couple of table lookups instead of rehashing the board.
+"""
+
+import random
+from array import array
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+NO_MOVE = 64
+ENTRY_BYTES = 16  # 8 bytes of key and 8 bytes of packed data
+DEFAULT_SIZE_MB = 16
+
+_random = random.Random(0x5EED)
+OWN_KEYS = tuple(_random.getrandbits(64) for _ in range(64))
+OPP_KEYS = tuple(_random.getrandbits(64) for _ in range(64))
+FLIP_KEYS = tuple(OWN_KEYS[sq] ^ OPP_KEYS[sq] for sq in range(64))
+
+
+def _byte_tables(keys: tuple) -> tuple:
+    """Precomputes xor of keys for every byte value at every byte offset"""
+    tables = []
+    for offset in range(8):
+        table = [0] * 256
+        for value in range(1, 256):
+            lowest = value & -value
+            table[value] = table[value ^ lowest] ^ keys[offset * 8 + lowest.bit_length() - 1]
+        tables.append(tuple(table))
+    return tuple(tables)
+
+
+_OWN_TABLES = _byte_tables(OWN_KEYS)
+_OPP_TABLES = _byte_tables(OPP_KEYS)
+_FLIP_TABLES = _byte_tables(FLIP_KEYS)
+
+
+def _hash_bits(bits: int, tables: tuple) -> int:
+    key = 0
+    for table in tables:
+        key ^= table[bits & 0xFF]
+        bits >>= 8
+    return key
+
+
+def zobrist(own: int, opp: int) -> int:
+    """Function computing Zobrist hash of position from scratch
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+
+    Returns:
+        int: 64-bit hash of position
+    """
+    return _hash_bits(own, _OWN_TABLES) ^ _hash_bits(opp, _OPP_TABLES)
+
+
+def zobrist_pair(own: int, opp: int) -> tuple[int, int]:
+    """Function computing hash of position and its mirror (own and opp swapped)
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+
+    Returns:
+        tuple[int, int]: (hash, mirror hash)
+    """
+    return zobrist(own, opp), zobrist(opp, own)
+
+
+def update_after_move(key: int, mirror: int, sq: int, flipped: int) -> tuple[int, int]:
+    """Function updating hash pair after side to move plays and turn passes
+
+    Args:
+        key (int): hash of position before move
+        mirror (int): mirror hash of position before move
+        sq (int): bit index of played square
+        flipped (int): bitboard of flipped disks
+
+    Returns:
+        tuple[int, int]: (hash, mirror hash) of position with opponent to move
+    """
+    flip_key = _hash_bits(flipped, _FLIP_TABLES)
+    return mirror ^ OPP_KEYS[sq] ^ flip_key, key ^ OWN_KEYS[sq] ^ flip_key
+
+
+class TranspositionTable:
+    """Fixed size hash table of searched positions
+
+    Entries are kept in two flat arrays (keys and packed data), so the memory
+    used is fixed at creation. Slot is replaced when it is empty, holds the same
+    position, was written during an older search or stores a shallower result.
+
+    Args:
+        size_mb (float): memory budget in megabytes
+    """
+
+    def __init__(self, size_mb: float = DEFAULT_SIZE_MB):
+        entries = max(1, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        self.size = 1 << (entries.bit_length() - 1)
+        self.mask = self.size - 1
+        self.keys = array("Q", bytes(8 * self.size))
+        self.data = array("q", bytes(8 * self.size))
+        self.generation = 1
+        self.used = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def clear(self):
+        """Function removing every entry and resetting statistics"""
+        self.keys = array("Q", bytes(8 * self.size))
+        self.data = array("q", bytes(8 * self.size))
+        self.generation = 1
+        self.used = 0
+        self.reset_statistics()
+
+    def reset_statistics(self):
+        """Function resetting probe and hit counters"""
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Function marking start of new search, entries of older searches get replaced first"""
+        self.generation = self.generation % 255 + 1
+
+    def probe(self, key: int):
+        """Function looking up position
+
+        Args:
+            key (int): hash of position
+
+        Returns:
+            tuple | None: (depth, bound, score, move) or None if not found,
+                move is None when no best move was stored
+        """
+        self.probes += 1
+        slot = key & self.mask
+        if self.keys[slot] != key:
+            return None
+        packed = self.data[slot]
+        if not packed:
+            return None
+        self.hits += 1
+        move = (packed >> 10) & 0x7F
+        return (
+            (packed >> 2) & 0xFF,
+            packed & 0x3,
+            packed >> 25,
+            None if move == NO_MOVE else move,
+        )
+
+    def store(self, key: int, depth: int, bound: int, score: int, move):
+        """Function storing search result of position
+
+        Args:
+            key (int): hash of position
+            depth (int): depth the position was searched to
+            bound (int): EXACT, LOWER or UPPER
+            score (int): score of position
+            move (int | None): bit index of best move
+        """
+        slot = key & self.mask
+        packed = self.data[slot]
+        if packed:
+            if (
+                self.keys[slot] != key
+                and (packed >> 17) & 0xFF == self.generation
+                and (packed >> 2) & 0xFF > depth
+            ):
+                return
+        else:
+            self.used += 1
+        self.stores += 1
+        self.keys[slot] = key
+        self.data[slot] = (
+            (score << 25)
+            | (self.generation << 17)
+            | ((NO_MOVE if move is None else move) << 10)
+            | (min(depth, 0xFF) << 2)
+            | bound
+        )
+
+    def hit_rate(self) -> float:
+        """Fraction of probes that found the position
+
+        Returns:
+            float: hit rate between 0 and 1
+        """
+        if not self.probes:
+            return 0.0
+        return self.hits / self.probes
+
+    def fill(self) -> float:
+        """Fraction of used slots
+
+        Returns:
+            float: fill between 0 and 1
+        """
+        return self.used / self.size
+
+    def __repr__(self) -> str:
+        return (
+            f"TranspositionTable(size={self.size}, fill={self.fill():.3f}, "
+            f"hit_rate={self.hit_rate():.3f}, probes={self.probes})"
+        )
@@ -17,3 +17,59 @@ class SaveFormatException(Exception):
 
     def __init__(self, message):
         super().__init__(message)
+
+
+class SearchAbortedException(Exception):
+    """Exception raised inside search when time or node budget runs out
+    or stop was requested
+
+    Args:
+        Exception (Exception): Extends
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class IllegalMoveException(Exception):
+    """Exception raised when game record contains move that is not legal
+
+    Args:
+        Exception (Exception): Extends
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class BookFormatException(Exception):
+    """Exception raised when opening book file is wrong or corrupt
+
+    Args:
+        Exception (Exception): Extends
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class DatabaseFormatException(Exception):
+    """Exception raised when game database files are wrong or corrupt
+
+    Args:
+        Exception (Exception): Extends
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
+
+
+class WthorFormatException(Exception):
+    """Exception raised when WTHOR game archive is wrong or corrupt
+
+    Args:
+        Exception (Exception): Extends
+    """
+
+    def __init__(self, message):
+        super().__init__(message)
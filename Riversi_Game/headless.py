@@ -0,0 +1,232 @@
+"""Headless entry point exposing the engine through line based text protocol
+
+Protocol is similar to GTP. Every command is one line, every response starts
+with "=" on success or "?" on error and ends with an empty line.
+
+Commands:
+    position startpos [moves <move> ...]   set start position and play moves
+    position <64 squares> <black|white>    set position, squares row by row from a1,
+                                           X black, O white, - or . empty
+    play <move|pass>                       play move for side to move
+    genmove [time <s>] [depth <n>] [nodes <n>]
+                                           choose and play move for side to move
+    stats                                  search statistics of the last genmove
+    legal                                  list legal moves
+    showboard                              print board
+    quit                                   exit
+
+Run from Riversi_Game directory:
+    python headless.py --time 1.0
+"""
+
+import argparse
+import sys
+import time
+from typing import Optional, TextIO
+from exceptions.exceptions import IllegalMoveException
+from model import bitboard
+from model.board import Board
+from engine import endgame
+from engine.engine import DEFAULT_ENDGAME_EMPTIES, Engine, create_engine
+from engine.search import MAX_DEPTH, SearchStatistics
+
+SQUARE_SYMBOLS = {"x": "black", "o": "white", "-": "", ".": ""}
+
+
+class ProtocolSession:
+    """Position and command handling of one protocol session
+
+    Args:
+        engine (Engine): engine answering genmove
+        time_limit (float): default time of genmove in seconds
+        max_depth (int): default maximal depth of genmove
+    """
+
+    def __init__(self, engine: Engine, time_limit: float, max_depth: int = MAX_DEPTH):
+        self.engine = engine
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.board = Board()
+        self.finished = False
+        self.statistics: Optional[SearchStatistics] = None
+
+    def execute(self, line: str) -> str:
+        """Function executing one command
+
+        Args:
+            line (str): command line
+
+        Returns:
+            str: response without trailing empty line
+        """
+        words = line.split()
+        if not words:
+            return ""
+        (command, args) = (words[0].lower(), words[1:])
+        handler = getattr(self, f"_command_{command}", None)
+        if handler is None:
+            return f"? unknown command: {command}"
+        try:
+            return "= " + handler(args)
+        except (ValueError, IllegalMoveException) as e:
+            return f"? {e}"
+
+    def _command_position(self, args: list) -> str:
+        if not args:
+            raise ValueError("position needs arguments")
+        board = Board()
+        if args[0].lower() == "startpos":
+            if len(args) > 1:
+                if args[1].lower() != "moves":
+                    raise ValueError(f"unexpected argument: {args[1]}")
+                for name in args[2:]:
+                    self._play(board, name)
+        else:
+            if len(args) != 2 or len(args[0]) != 64:
+                raise ValueError("position needs 64 squares and side to move")
+            try:
+                fields = [SQUARE_SYMBOLS[symbol] for symbol in args[0].lower()]
+            except KeyError as e:
+                raise ValueError(f"invalid square symbol: {e.args[0]}") from e
+            board.board = [fields[x * 8 : x * 8 + 8] for x in range(8)]
+            if args[1].lower() not in ("black", "white"):
+                raise ValueError(f"invalid side to move: {args[1]}")
+            board.player = 0 if args[1].lower() == "black" else 1
+        self.board = board
+        return ""
+
+    def _command_play(self, args: list) -> str:
+        if len(args) != 1:
+            raise ValueError("play needs one move")
+        self._play(self.board, args[0])
+        return ""
+
+    def _command_genmove(self, args: list) -> str:
+        time_limit = self.time_limit
+        max_depth = self.max_depth
+        node_limit: Optional[int] = None
+        if len(args) % 2:
+            raise ValueError("genmove arguments come in name value pairs")
+        for name, value in zip(args[::2], args[1::2]):
+            if name == "time":
+                time_limit = float(value)
+            elif name == "depth":
+                max_depth = int(value)
+            elif name == "nodes":
+                node_limit = int(value)
+            else:
+                raise ValueError(f"unknown genmove argument: {name}")
+
+        if not self.board.has_legal_move(self.board.player):
+            if not self.board.has_legal_move(1 - self.board.player):
+                raise ValueError("game is over")
+            self._play(self.board, "pass")
+            return "pass"
+
+        (own, opp) = self.board.get_bitboards(self.board.player)
+        start = time.perf_counter()
+        result = self.engine.choose_move(own, opp, time_limit, max_depth, node_limit)
+        elapsed = time.perf_counter() - start
+        self.statistics = result.statistics
+        name = bitboard.square_name(result.move)
+        self._play(self.board, name)
+        return (
+            f"{name} score {result.score} depth {result.depth} "
+            f"nodes {result.statistics.nodes} nps {result.statistics.nps:.0f} time {elapsed:.3f}"
+        )
+
+    def _command_stats(self, args: list) -> str:
+        if self.statistics is None:
+            raise ValueError("no search yet")
+        statistics = self.statistics
+        rows = [statistics.summary()]
+        for iteration in statistics.iterations:
+            move = "pass" if iteration.move is None else bitboard.square_name(iteration.move)
+            rows.append(
+                f"iteration depth {iteration.depth} move {move} score {iteration.score} "
+                f"nodes {iteration.nodes} time {iteration.seconds:.3f}"
+            )
+        last = max((index for index, count in enumerate(statistics.cutoffs) if count), default=-1)
+        rows.append("cutoffs " + " ".join(str(count) for count in statistics.cutoffs[: last + 1]))
+        return "\n" + "\n".join(rows)
+
+    def _command_legal(self, args: list) -> str:
+        moves = self.board.legal_moves(self.board.player)
+        return " ".join(bitboard.square_name(sq) for sq in bitboard.iter_squares(moves))
+
+    def _command_showboard(self, args: list) -> str:
+        rows = ["  a b c d e f g h"]
+        for x, row in enumerate(self.board.board):
+            symbols = [{"black": "X", "white": "O"}.get(field, ".") for field in row]
+            rows.append(f"{x + 1} " + " ".join(symbols))
+        (black, white) = self.board.counts
+        rows.append(f"{self.board.get_player_color()} to move, black {black} white {white}")
+        return "\n" + "\n".join(rows)
+
+    def _command_quit(self, args: list) -> str:
+        self.finished = True
+        return ""
+
+    @staticmethod
+    def _play(board: Board, name: str):
+        """Plays move given by name for side to move of board"""
+        moves = board.legal_moves(board.player)
+        if name.lower() == "pass":
+            if moves:
+                raise IllegalMoveException("pass is not legal, there are legal moves")
+            if not board.has_legal_move(1 - board.player):
+                raise IllegalMoveException("game is over")
+        else:
+            sq = bitboard.parse_square(name)
+            if not moves >> sq & 1:
+                raise IllegalMoveException(f"illegal move: {name}")
+            board.play(board.player, sq)
+        board.player = 1 - board.player
+
+
+def run(session: ProtocolSession, commands: TextIO, responses: TextIO):
+    """Function answering commands until quit or end of input
+
+    Args:
+        session (ProtocolSession): session executing commands
+        commands (TextIO): stream of commands
+        responses (TextIO): stream of responses
+    """
+    for line in commands:
+        if not line.strip():
+            continue
+        responses.write(session.execute(line) + "\n\n")
+        responses.flush()
+        if session.finished:
+            break
+
+
+def main():
+    """Command line entry point of headless engine"""
+    parser = argparse.ArgumentParser(description="Riversi engine text protocol")
+    parser.add_argument("--time", type=float, default=1.0, help="seconds per move")
+    parser.add_argument("--depth", type=int, default=MAX_DEPTH)
+    parser.add_argument("--weights", default="weights.npz")
+    parser.add_argument("--book", default="book.bin")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--endgame-empties", type=int, default=DEFAULT_ENDGAME_EMPTIES)
+    parser.add_argument(
+        "--endgame-mode", choices=(endgame.EXACT, endgame.WLD), default=endgame.EXACT
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(
+        args.weights,
+        args.book,
+        args.workers,
+        endgame_empties=args.endgame_empties,
+        endgame_mode=args.endgame_mode,
+    )
+    try:
+        run(ProtocolSession(engine, args.time, args.depth), sys.stdin, sys.stdout)
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
-"""Main driving module of the application"""
+"""Main driving module of the application
+
+Run from Riversi_Game directory:
+    python main.py [--profile report.txt [--cprofile]]
+"""
+import argparse
 import tkinter as tk
 import controller.controller as controller
+from controller import profiling
 import model.board as board
 import view.view as view
 
@@ -25,6 +31,7 @@ class App(tk.Tk):
         self.cont = controller.Controller(self.m, self.v, self.menu, self.leaderboard)
         self.v.set_controller(self.cont)
         self.menu.set_controller(self.cont)
+        self.leaderboard.set_controller(self.cont)
 
     def show_game(self):
         """Function hiding all windows apart from game window"""
@@ -45,5 +52,17 @@ class App(tk.Tk):
         self.leaderboard.pack(expand=True, fill="both")
 
 
+parser = argparse.ArgumentParser(description="Riversi game")
+parser.add_argument("--profile", metavar="REPORT", help="write timing report of the session")
+parser.add_argument("--cprofile", action="store_true", help="add cProfile capture to the report")
+args = parser.parse_args()
+
+profiler = profiling.from_environment(args.profile, args.cprofile)
 app = App()
-app.mainloop()
+if profiler is not None:
+    profiling.install(profiler, app.cont, app.v, app.leaderboard)
+try:
+    app.mainloop()
+finally:
+    if profiler is not None:
+        profiler.close()
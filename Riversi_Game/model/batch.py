@@ -0,0 +1,262 @@
+"""Module containing NumPy versions of bitboard operations
+
+Every function works on arrays of bitboards (dtype uint64) at once, element i
+of every argument describes position i. Semantics follow model.bitboard.
+
+Positions can also be given as (N, 2) uint64 array of (own, opp) bitboards
+or as (N, 8, 8) int8 array with 1 for disks of side to move, -1 for opponent's
+disks and 0 for empty squares, indexed [position, x, y] like Board.board.
+"""
+
+import numpy as np
+from model import bitboard
+
+FULL_MASK = np.uint64(bitboard.FULL_MASK)
+_LEFT_DIRECTIONS = tuple(
+    (np.uint64(shift), np.uint64(mask)) for shift, mask in bitboard.LEFT_DIRECTIONS
+)
+_RIGHT_DIRECTIONS = tuple(
+    (np.uint64(shift), np.uint64(mask)) for shift, mask in bitboard.RIGHT_DIRECTIONS
+)
+
+
+def as_bitboards(values) -> np.ndarray:
+    """Function converting sequence of bitboards to uint64 array
+
+    Args:
+        values (Iterable[int] | np.ndarray): bitboards
+
+    Returns:
+        np.ndarray: uint64 array
+    """
+    if isinstance(values, np.ndarray):
+        return values.astype(np.uint64, copy=False)
+    return np.fromiter((int(value) for value in values), dtype=np.uint64)
+
+
+def to_bitboards(positions) -> tuple:
+    """Function converting array of positions to bitboards
+
+    Args:
+        positions (np.ndarray): (N, 2) uint64 (own, opp) pairs or (N, 8, 8) int8 boards
+
+    Raises:
+        ValueError: when array has other shape
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: uint64 (own, opp) bitboards
+    """
+    positions = np.asarray(positions)
+    if positions.ndim == 2 and positions.shape[1] == 2:
+        positions = positions.astype(np.uint64, copy=False)
+        return positions[:, 0].copy(), positions[:, 1].copy()
+    if positions.ndim == 3 and positions.shape[1:] == (8, 8):
+        flat = positions.reshape(-1, 64)
+        return _pack(flat == 1), _pack(flat == -1)
+    raise ValueError(f"Unsupported positions shape: {positions.shape}")
+
+
+def to_boards(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Function converting bitboards to (N, 8, 8) int8 boards
+
+    Args:
+        own (np.ndarray): uint64 bitboards of side to move
+        opp (np.ndarray): uint64 bitboards of opponent
+
+    Returns:
+        np.ndarray: int8 boards, 1 own disk, -1 opponent disk, 0 empty
+    """
+    boards = unpack(own).astype(np.int8) - unpack(opp).astype(np.int8)
+    return boards.reshape(-1, 8, 8)
+
+
+def unpack(bits: np.ndarray) -> np.ndarray:
+    """Function converting bitboards to (N, 64) bool arrays indexed by bit index
+
+    Args:
+        bits (np.ndarray): uint64 bitboards
+
+    Returns:
+        np.ndarray: bool array, [i, sq] is True when bit sq of bitboard i is set
+    """
+    as_bytes = np.ascontiguousarray(bits, dtype="<u8").view(np.uint8).reshape(-1, 8)
+    return np.unpackbits(as_bytes, axis=1, bitorder="little").astype(bool)
+
+
+def _pack(squares: np.ndarray) -> np.ndarray:
+    """Inverse of unpack"""
+    packed = np.packbits(squares.astype(np.uint8), axis=1, bitorder="little")
+    return np.ascontiguousarray(packed).view("<u8").reshape(-1).astype(np.uint64)
+
+
+def popcount(bits: np.ndarray) -> np.ndarray:
+    """Number of set bits of every bitboard
+
+    Args:
+        bits (np.ndarray): uint64 bitboards
+
+    Returns:
+        np.ndarray: int64 counts
+    """
+    return unpack(bits).sum(axis=1, dtype=np.int64)
+
+
+def legal_moves(own: np.ndarray, opp: np.ndarray) -> np.ndarray:
+    """Function generating legal moves of side to move in every position
+
+    Args:
+        own (np.ndarray): uint64 bitboards of side to move
+        opp (np.ndarray): uint64 bitboards of opponent
+
+    Returns:
+        np.ndarray: uint64 bitboards of legal moves
+    """
+    moves = np.zeros_like(own)
+    for shift, mask in _LEFT_DIRECTIONS:
+        line_opp = opp & mask
+        candidates = (own << shift) & line_opp
+        for _ in range(5):
+            candidates |= (candidates << shift) & line_opp
+        moves |= (candidates << shift) & mask
+    for shift, mask in _RIGHT_DIRECTIONS:
+        line_opp = opp & mask
+        candidates = (own >> shift) & line_opp
+        for _ in range(5):
+            candidates |= (candidates >> shift) & line_opp
+        moves |= (candidates >> shift) & mask
+    return moves & ~(own | opp)
+
+
+def flips(own: np.ndarray, opp: np.ndarray, squares: np.ndarray) -> np.ndarray:
+    """Function computing disks flipped by playing given square in every position
+
+    Args:
+        own (np.ndarray): uint64 bitboards of side to move
+        opp (np.ndarray): uint64 bitboards of opponent
+        squares (np.ndarray): bit index of played square for every position
+
+    Returns:
+        np.ndarray: uint64 bitboards of flipped disks, 0 for illegal moves
+    """
+    move = np.uint64(1) << np.asarray(squares).astype(np.uint64)
+    flipped = np.zeros_like(own)
+    zero = np.uint64(0)
+    for shift, mask in _LEFT_DIRECTIONS:
+        line_opp = opp & mask
+        line = (move << shift) & line_opp
+        for _ in range(5):
+            line |= (line << shift) & line_opp
+        # only the last disk of the line can shift onto a disk that is not opponent's
+        closed = ((line << shift) & mask & own) != zero
+        flipped |= np.where(closed, line, zero)
+    for shift, mask in _RIGHT_DIRECTIONS:
+        line_opp = opp & mask
+        line = (move >> shift) & line_opp
+        for _ in range(5):
+            line |= (line >> shift) & line_opp
+        closed = ((line >> shift) & mask & own) != zero
+        flipped |= np.where(closed, line, zero)
+    return flipped
+
+
+def play(own: np.ndarray, opp: np.ndarray, squares: np.ndarray) -> tuple:
+    """Function playing given square in every position
+
+    Args:
+        own (np.ndarray): uint64 bitboards of side to move
+        opp (np.ndarray): uint64 bitboards of opponent
+        squares (np.ndarray): bit index of played square for every position
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (own, opp) after the moves, the side to move is not swapped
+    """
+    flipped = flips(own, opp, squares)
+    move = np.uint64(1) << np.asarray(squares).astype(np.uint64)
+    return own | flipped | move, opp & ~flipped
+
+
+def expand(own: np.ndarray, opp: np.ndarray) -> tuple:
+    """Function generating every child of every position
+
+    Positions without legal move produce no children, callers handle passes.
+
+    Args:
+        own (np.ndarray): uint64 bitboards of side to move
+        opp (np.ndarray): uint64 bitboards of opponent
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]: (parent index, move,
+            child own, child opp) for every child, children have opponent to move
+    """
+    (parents, squares) = np.nonzero(unpack(legal_moves(own, opp)))
+    (new_own, new_opp) = play(own[parents], opp[parents], squares)
+    return parents, squares, new_opp, new_own
+
+
+def neighbours(bits: np.ndarray) -> np.ndarray:
+    """Function finding squares adjacent to any square of every bitboard
+
+    Args:
+        bits (np.ndarray): uint64 bitboards
+
+    Returns:
+        np.ndarray: uint64 bitboards of adjacent squares
+    """
+    result = np.zeros_like(bits)
+    for shift, mask in _LEFT_DIRECTIONS:
+        result |= (bits << shift) & mask
+    for shift, mask in _RIGHT_DIRECTIONS:
+        result |= (bits >> shift) & mask
+    return result
+
+
+def flip_vertical(bits: np.ndarray) -> np.ndarray:
+    """Function mirroring every bitboard upside down
+
+    Args:
+        bits (np.ndarray): uint64 bitboards
+
+    Returns:
+        np.ndarray: mirrored bitboards
+    """
+    return bits.byteswap()
+
+
+def mirror_horizontal(bits: np.ndarray) -> np.ndarray:
+    """Function mirroring every bitboard left to right
+
+    Args:
+        bits (np.ndarray): uint64 bitboards
+
+    Returns:
+        np.ndarray: mirrored bitboards
+    """
+    for shift, mask in (
+        (1, 0x5555_5555_5555_5555),
+        (2, 0x3333_3333_3333_3333),
+        (4, 0x0F0F_0F0F_0F0F_0F0F),
+    ):
+        shift = np.uint64(shift)
+        mask = np.uint64(mask)
+        bits = ((bits >> shift) & mask) | ((bits & mask) << shift)
+    return bits
+
+
+def transpose(bits: np.ndarray) -> np.ndarray:
+    """Function mirroring every bitboard along main diagonal
+
+    Args:
+        bits (np.ndarray): uint64 bitboards
+
+    Returns:
+        np.ndarray: transposed bitboards
+    """
+    for shift, mask in (
+        (28, 0x0F0F_0F0F_0000_0000),
+        (14, 0x3333_0000_3333_0000),
+        (7, 0x5500_5500_5500_5500),
+    ):
+        shift = np.uint64(shift)
+        t = np.uint64(mask) & (bits ^ (bits << shift))
+        bits = bits ^ t ^ (t >> shift)
+    return bits
@@ -0,0 +1,396 @@
+"""Module containing bitboard representation of the game board
+
+Position is stored as two 64-bit integers, one per color. Square (x, y) of the
+list-of-strings board maps to bit x * 8 + y, so x is the row and y the column.
+All move generation works on the side to move (own) and its opponent (opp).
+"""
+
+from exceptions.exceptions import IllegalMoveException
+
+FULL_MASK = 0xFFFF_FFFF_FFFF_FFFF
+NOT_FIRST_COLUMN = 0xFEFE_FEFE_FEFE_FEFE
+NOT_LAST_COLUMN = 0x7F7F_7F7F_7F7F_7F7F
+
+START_BLACK = (1 << (3 * 8 + 4)) | (1 << (4 * 8 + 3))
+START_WHITE = (1 << (3 * 8 + 3)) | (1 << (4 * 8 + 4))
+
+# (shift, mask applied after shifting) for every one of 8 directions,
+# positive shift means shifting left (towards higher bit indexes)
+DIRECTIONS = (
+    (1, NOT_FIRST_COLUMN),
+    (-1, NOT_LAST_COLUMN),
+    (8, FULL_MASK),
+    (-8, FULL_MASK),
+    (9, NOT_FIRST_COLUMN),
+    (7, NOT_LAST_COLUMN),
+    (-7, NOT_FIRST_COLUMN),
+    (-9, NOT_LAST_COLUMN),
+)
+
+
+def square(x: int, y: int) -> int:
+    """Function translating board coordinates to bit index
+
+    Args:
+        x (int): first coordinate (row)
+        y (int): last coordinate (column)
+
+    Returns:
+        int: bit index of the square
+    """
+    return x * 8 + y
+
+
+def coordinates(sq: int) -> tuple[int, int]:
+    """Function translating bit index to board coordinates
+
+    Args:
+        sq (int): bit index of the square
+
+    Returns:
+        tuple[int, int]: (row, column) of the square
+    """
+    return sq >> 3, sq & 7
+
+
+def popcount(bits: int) -> int:
+    """Number of set bits
+
+    Args:
+        bits (int): bitboard
+
+    Returns:
+        int: number of squares in the bitboard
+    """
+    return bits.bit_count()
+
+
+def iter_squares(bits: int):
+    """Generator yielding bit indexes of every set bit, lowest first
+
+    Args:
+        bits (int): bitboard
+
+    Yields:
+        int: bit index of square
+    """
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+# directions towards higher and lower bit indexes, split so shifts can be inlined
+LEFT_DIRECTIONS = tuple((shift, mask) for shift, mask in DIRECTIONS if shift > 0)
+RIGHT_DIRECTIONS = tuple((-shift, mask) for shift, mask in DIRECTIONS if shift < 0)
+
+
+def _rays(dx: int, dy: int) -> tuple:
+    """Precomputes bitboard of squares in direction (dx, dy) from every square"""
+    rays = []
+    for sq in range(64):
+        ray = 0
+        x, y = sq >> 3, sq & 7
+        x, y = x + dx, y + dy
+        while 0 <= x <= 7 and 0 <= y <= 7:
+            ray |= 1 << (x * 8 + y)
+            x, y = x + dx, y + dy
+        rays.append(ray)
+    return tuple(rays)
+
+
+# rays going towards higher bit indexes (first square of a ray is its lowest bit)
+# and towards lower bit indexes (first square is its highest bit)
+LEFT_RAYS = tuple(_rays(dx, dy) for dx, dy in ((0, 1), (1, 0), (1, 1), (1, -1)))
+RIGHT_RAYS = tuple(_rays(dx, dy) for dx, dy in ((0, -1), (-1, 0), (-1, -1), (-1, 1)))
+
+
+def legal_moves(own: int, opp: int) -> int:
+    """Function generating every legal move for the side to move
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+
+    Returns:
+        int: bitboard with a bit set on every legal move
+    """
+    moves = 0
+    for shift, mask in LEFT_DIRECTIONS:
+        # opponent disks have to be masked too, otherwise lines wrap around columns
+        line_opp = opp & mask
+        candidates = (own << shift) & line_opp
+        candidates |= (candidates << shift) & line_opp
+        candidates |= (candidates << shift) & line_opp
+        candidates |= (candidates << shift) & line_opp
+        candidates |= (candidates << shift) & line_opp
+        candidates |= (candidates << shift) & line_opp
+        moves |= (candidates << shift) & mask
+    for shift, mask in RIGHT_DIRECTIONS:
+        line_opp = opp & mask
+        candidates = (own >> shift) & line_opp
+        candidates |= (candidates >> shift) & line_opp
+        candidates |= (candidates >> shift) & line_opp
+        candidates |= (candidates >> shift) & line_opp
+        candidates |= (candidates >> shift) & line_opp
+        candidates |= (candidates >> shift) & line_opp
+        moves |= (candidates >> shift) & mask
+    return moves & ~(own | opp) & FULL_MASK
+
+
+def neighbours(bits: int) -> int:
+    """Function finding squares adjacent to any square of bitboard
+
+    Args:
+        bits (int): bitboard
+
+    Returns:
+        int: bitboard of adjacent squares (may include squares of given bitboard)
+    """
+    result = 0
+    for shift, mask in LEFT_DIRECTIONS:
+        result |= (bits << shift) & mask
+    for shift, mask in RIGHT_DIRECTIONS:
+        result |= (bits >> shift) & mask
+    return result & FULL_MASK
+
+
+def flips(own: int, opp: int, sq: int) -> int:
+    """Function computing disks flipped by playing on given square
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+        sq (int): bit index of played square
+
+    Returns:
+        int: bitboard of flipped disks, 0 if the move is illegal
+    """
+    flipped = 0
+    not_opp = ~opp
+    for rays in LEFT_RAYS:
+        ray = rays[sq]
+        # first square of the ray which is not opponent's
+        blocker = ray & not_opp
+        blocker &= -blocker
+        if blocker & own:
+            flipped |= ray & (blocker - 1)
+    for rays in RIGHT_RAYS:
+        ray = rays[sq]
+        blocker = ray & not_opp
+        if blocker:
+            blocker = 1 << (blocker.bit_length() - 1)
+            if blocker & own:
+                flipped |= ray & ~((blocker << 1) - 1)
+    return flipped
+
+
+def play(own: int, opp: int, sq: int) -> tuple[int, int]:
+    """Function playing a move for the side to move
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+        sq (int): bit index of played square
+
+    Returns:
+        tuple[int, int]: (own, opp) bitboards after the move, the side to move is not swapped
+    """
+    flipped = flips(own, opp, sq)
+    return own | flipped | (1 << sq), opp & ~flipped
+
+
+def from_lists(board: list) -> tuple[int, int]:
+    """Function converting list-of-strings board to bitboards
+
+    Args:
+        board (list(list(str))): array representing board state
+
+    Returns:
+        tuple[int, int]: (black, white) bitboards
+    """
+    black = 0
+    white = 0
+    for x, row in enumerate(board):
+        for y, field in enumerate(row):
+            if field == "black":
+                black |= 1 << square(x, y)
+            elif field == "white":
+                white |= 1 << square(x, y)
+    return black, white
+
+
+def to_lists(black: int, white: int) -> list:
+    """Function converting bitboards to list-of-strings board
+
+    Args:
+        black (int): bitboard of black disks
+        white (int): bitboard of white disks
+
+    Returns:
+        list(list(str)): array representing board state
+    """
+    board = [["" for _ in range(8)] for _ in range(8)]
+    for sq in iter_squares(black):
+        board[sq >> 3][sq & 7] = "black"
+    for sq in iter_squares(white):
+        board[sq >> 3][sq & 7] = "white"
+    return board
+
+
+def flip_vertical(bits: int) -> int:
+    """Function mirroring bitboard upside down (row x goes to row 7 - x)
+
+    Args:
+        bits (int): bitboard
+
+    Returns:
+        int: mirrored bitboard
+    """
+    return int.from_bytes(bits.to_bytes(8, "little"), "big")
+
+
+def mirror_horizontal(bits: int) -> int:
+    """Function mirroring bitboard left to right (column y goes to column 7 - y)
+
+    Args:
+        bits (int): bitboard
+
+    Returns:
+        int: mirrored bitboard
+    """
+    bits = ((bits >> 1) & 0x5555_5555_5555_5555) | ((bits & 0x5555_5555_5555_5555) << 1)
+    bits = ((bits >> 2) & 0x3333_3333_3333_3333) | ((bits & 0x3333_3333_3333_3333) << 2)
+    bits = ((bits >> 4) & 0x0F0F_0F0F_0F0F_0F0F) | ((bits & 0x0F0F_0F0F_0F0F_0F0F) << 4)
+    return bits
+
+
+def transpose(bits: int) -> int:
+    """Function mirroring bitboard along main diagonal (square (x, y) goes to (y, x))
+
+    Args:
+        bits (int): bitboard
+
+    Returns:
+        int: transposed bitboard
+    """
+    t = 0x0F0F_0F0F_0000_0000 & (bits ^ (bits << 28))
+    bits ^= t ^ (t >> 28)
+    t = 0x3333_0000_3333_0000 & (bits ^ (bits << 14))
+    bits ^= t ^ (t >> 14)
+    t = 0x5500_5500_5500_5500 & (bits ^ (bits << 7))
+    bits ^= t ^ (t >> 7)
+    return bits & FULL_MASK
+
+
+def transform(bits: int, symmetry: int) -> int:
+    """Function applying one of 8 board symmetries
+
+    Args:
+        bits (int): bitboard
+        symmetry (int): 0-7, bit 1 flips vertically, bit 2 mirrors horizontally
+            and bit 4 transposes, applied in this order
+
+    Returns:
+        int: transformed bitboard
+    """
+    if symmetry & 1:
+        bits = flip_vertical(bits)
+    if symmetry & 2:
+        bits = mirror_horizontal(bits)
+    if symmetry & 4:
+        bits = transpose(bits)
+    return bits
+
+
+def canonical(own: int, opp: int) -> tuple[int, int, int]:
+    """Function finding representative of position among its 8 symmetric variants
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+
+    Returns:
+        tuple[int, int, int]: (own, opp, symmetry) of the smallest variant,
+            symmetry transforms given position to the representative
+    """
+    best = (own, opp, 0)
+    for symmetry in range(1, 8):
+        variant = (transform(own, symmetry), transform(opp, symmetry), symmetry)
+        if variant < best:
+            best = variant
+    return best
+
+
+def square_name(sq: int) -> str:
+    """Function translating bit index to notation used in game records (e.g. f5)
+
+    Args:
+        sq (int): bit index of the square
+
+    Returns:
+        str: column letter a-h followed by row number 1-8
+    """
+    return "abcdefgh"[sq & 7] + str((sq >> 3) + 1)
+
+
+def parse_square(name: str) -> int:
+    """Function translating square name (e.g. f5) to bit index
+
+    Args:
+        name (str): column letter a-h followed by row number 1-8
+
+    Raises:
+        ValueError: when name is not a square
+
+    Returns:
+        int: bit index of the square
+    """
+    name = name.strip().lower()
+    if len(name) != 2 or name[0] not in "abcdefgh" or name[1] not in "12345678":
+        raise ValueError(f"Invalid square: {name}")
+    return square(int(name[1]) - 1, "abcdefgh".index(name[0]))
+
+
+def parse_moves(text: str) -> list:
+    """Function translating concatenated move list (e.g. f5d6c3) to bit indexes
+
+    Args:
+        text (str): game record
+
+    Raises:
+        ValueError: when text contains something else than squares
+
+    Returns:
+        list[int]: bit indexes of moves
+    """
+    text = "".join(text.split())
+    return [parse_square(text[i : i + 2]) for i in range(0, len(text), 2)]
+
+
+def replay(moves: list):
+    """Generator replaying game from start position, passes are implied
+
+    Args:
+        moves (list[int]): bit indexes of moves
+
+    Raises:
+        IllegalMoveException: when a move is not legal in reached position
+
+    Yields:
+        tuple[int, int, int, int]: (own, opp, player, move) before every move,
+            player is 0 for black and 1 for white
+    """
+    own, opp, player = START_BLACK, START_WHITE, 0
+    for ply, sq in enumerate(moves):
+        legal = legal_moves(own, opp)
+        if not legal:
+            own, opp, player = opp, own, 1 - player
+            legal = legal_moves(own, opp)
+        if not legal >> sq & 1:
+            raise IllegalMoveException(
+                f"Illegal move {square_name(sq)} at ply {ply + 1}"
+            )
+        yield own, opp, player, sq
+        own, opp = play(own, opp, sq)
+        own, opp, player = opp, own, 1 - player
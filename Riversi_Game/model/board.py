@@ -1,23 +1,56 @@
 """Module containing data models for the app"""
 
 import json
+from model import bitboard
 
 
 class Board:
-    """Class representing game board"""
+    """Class representing game board
+
+    Position is backed by two bitboards (black and white), list-of-strings
+    form is available through board property for view and save files.
+    Disc counts, empty squares and legal moves of both players are kept up to
+    date by play, so pass and end checks do not scan the board. Played moves are recorded in history,
+    from_start tells if history starts at the start position.
+    """
 
     def __init__(self):
         self.ai = False
         self.player = 0
-        self.board = [["" for _ in range(8)] for _ in range(8)]
-        self.board[3][3] = "white"
-        self.board[3][4] = "black"
-        self.board[4][3] = "black"
-        self.board[4][4] = "white"
-        
+        self.black = bitboard.START_BLACK
+        self.white = bitboard.START_WHITE
+        self.__refresh()
+
+    def __refresh(self):
+        """Recomputes derived state from bitboards, position set directly has no history"""
+        self.history: list[int] = []
+        self.from_start = (self.black, self.white) == (bitboard.START_BLACK, bitboard.START_WHITE)
+        self.counts = [bitboard.popcount(self.black), bitboard.popcount(self.white)]
+        self.empty = ~(self.black | self.white) & bitboard.FULL_MASK
+        self.__update_moves()
+
+    def __update_moves(self):
+        self.legal = [
+            bitboard.legal_moves(self.black, self.white),
+            bitboard.legal_moves(self.white, self.black),
+        ]
 
     def __repr__(self) -> str:
-        return json.dumps(self.__dict__)
+        return json.dumps({"ai": self.ai, "player": self.player, "board": self.board})
+
+    @property
+    def board(self) -> list:
+        """Board as array of "", "black" and "white" strings
+
+        Returns:
+            list(list(str)): array representing board state
+        """
+        return bitboard.to_lists(self.black, self.white)
+
+    @board.setter
+    def board(self, board: list):
+        self.black, self.white = bitboard.from_lists(board)
+        self.__refresh()
 
     def get_player_color(self) -> str:
         """Function to get current player's color
@@ -28,3 +61,89 @@ class Board:
         if self.player == 0:
             return "black"
         return "white"
+
+    def get_bitboards(self, player: int) -> tuple[int, int]:
+        """Function to get bitboards from perspective of given player
+
+        Args:
+            player (int): 0 or 1 depending on color
+
+        Returns:
+            tuple[int, int]: (own, opponent) bitboards
+        """
+        if player == 0:
+            return self.black, self.white
+        return self.white, self.black
+
+    def set_bitboards(self, player: int, own: int, opp: int):
+        """Function to set bitboards from perspective of given player
+
+        Args:
+            player (int): 0 or 1 depending on color
+            own (int): bitboard of given player
+            opp (int): bitboard of opponent
+        """
+        if player == 0:
+            self.black, self.white = own, opp
+        else:
+            self.white, self.black = own, opp
+        self.__refresh()
+
+    def play(self, player: int, sq: int) -> int:
+        """Function playing legal move of given player, disk counts and empty
+        squares are updated from the played square and flipped disks, legal moves
+        of both players are generated again from the new bitboards
+
+        Args:
+            player (int): 0 or 1 depending on color
+            sq (int): bit index of played square
+
+        Returns:
+            int: bitboard of flipped disks
+        """
+        (own, opp) = self.get_bitboards(player)
+        flipped = bitboard.flips(own, opp, sq)
+        move = 1 << sq
+        if player == 0:
+            self.black = own | flipped | move
+            self.white = opp & ~flipped
+        else:
+            self.white = own | flipped | move
+            self.black = opp & ~flipped
+        changed = flipped.bit_count()
+        self.counts[player] += changed + 1
+        self.counts[1 - player] -= changed
+        self.empty &= ~move
+        self.__update_moves()
+        self.history.append(sq)
+        return flipped
+
+    def legal_moves(self, player: int) -> int:
+        """Function returning legal moves of given player
+
+        Args:
+            player (int): 0 or 1 depending on color
+
+        Returns:
+            int: bitboard of legal moves
+        """
+        return self.legal[player]
+
+    def has_legal_move(self, player: int) -> bool:
+        """Function checking if given player can move
+
+        Args:
+            player (int): 0 or 1 depending on color
+
+        Returns:
+            bool: True if player has a legal move
+        """
+        return self.legal[player] != 0
+
+    def is_full(self) -> bool:
+        """Function checking if every square is taken
+
+        Returns:
+            bool: True if there is no empty square
+        """
+        return self.empty == 0
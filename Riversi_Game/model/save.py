@@ -0,0 +1,180 @@
+"""Module containing game save format
+
+Save is a binary record: header, played moves (one byte each, bit index of
+the square, passes are implied) and the final position as two bitboards.
+Position is read directly, moves are kept as history for replay and analysis.
+Records can be written one after another, read_board reads them one by one.
+
+Record: magic, version (uint8), flags (uint8), player (uint8), pad,
+move count (uint16), moves (uint8 each), black (uint64), white (uint64)
+
+Old JSON saves ({"ai", "player", "board"} on one line) are still loaded.
+"""
+
+import io
+import json
+import struct
+from typing import BinaryIO, Optional
+from exceptions.exceptions import SaveFormatException
+from model import bitboard
+from model.board import Board
+
+MAGIC = b"RVSV"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBxH")
+POSITION = struct.Struct("<QQ")
+
+FLAG_AI = 1
+FLAG_FROM_START = 2  # history starts at the start position
+
+
+def write_board(f: BinaryIO, board: Board):
+    """Function appending save record of board to binary file
+
+    Args:
+        f (BinaryIO): file opened for binary writing
+        board (Board): saved game
+    """
+    flags = (FLAG_AI if board.ai else 0) | (FLAG_FROM_START if board.from_start else 0)
+    f.write(HEADER.pack(MAGIC, VERSION, flags, board.player, len(board.history)))
+    f.write(bytes(board.history))
+    f.write(POSITION.pack(board.black, board.white))
+
+
+def read_board(f: BinaryIO) -> Optional[Board]:
+    """Function reading next save record of binary file
+
+    Args:
+        f (BinaryIO): file opened for binary reading
+
+    Raises:
+        SaveFormatException: when data is not a save record
+
+    Returns:
+        Board | None: saved game or None at the end of file
+    """
+    header = f.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) != HEADER.size:
+        raise SaveFormatException("Truncated save record")
+    (magic, version, flags, player, count) = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise SaveFormatException("Not a save record")
+    if version != VERSION:
+        raise SaveFormatException(f"Unsupported save version: {version}")
+    data = f.read(count + POSITION.size)
+    if len(data) != count + POSITION.size:
+        raise SaveFormatException("Truncated save record")
+    history = list(data[:count])
+    (black, white) = POSITION.unpack_from(data, count)
+
+    if (
+        player not in (0, 1)
+        or black & white
+        or black > bitboard.FULL_MASK
+        or any(sq > 63 for sq in history)
+        or (flags & FLAG_FROM_START and bitboard.popcount(black | white) != 4 + count)
+    ):
+        raise SaveFormatException("Invalid save record")
+
+    board = Board()
+    board.set_bitboards(0, black, white)
+    board.ai = bool(flags & FLAG_AI)
+    board.player = player
+    board.history = history
+    board.from_start = bool(flags & FLAG_FROM_START)
+    return board
+
+
+def iter_boards(f: BinaryIO):
+    """Generator reading every save record of binary file
+
+    Args:
+        f (BinaryIO): file opened for binary reading
+
+    Raises:
+        SaveFormatException: when data is not a save record
+
+    Yields:
+        Board: saved game
+    """
+    while (board := read_board(f)) is not None:
+        yield board
+
+
+def validate_json(data) -> bool:
+    """Validate if data in save file conforms to json save format
+
+    Args:
+        data (json_data): json data read of file
+
+    Returns:
+        bool: True if data in save file conforms to json save format
+    """
+    if not isinstance(data, dict):
+        return False
+
+    required_keys = {
+        "ai": bool,
+        "player": int,
+        "board": list
+    }
+
+    for key, value_type in required_keys.items():
+        if key not in data or not isinstance(data[key], value_type):
+            return False
+
+    board = data["board"]
+    if len(board) != 8:
+        return False
+
+    for row in board:
+        if not isinstance(row, list) or len(row) != 8:
+            return False
+        for cell in row:
+            if cell not in {"", "white", "black"}:
+                return False
+
+    return True
+
+
+def save(path: str, board: Board):
+    """Function writing game to save file
+
+    Args:
+        path (str): file path
+        board (Board): saved game
+    """
+    with open(path, "wb") as f:
+        write_board(f, board)
+
+
+def load(path: str) -> Board:
+    """Function reading first game of save file, old JSON saves included
+
+    Args:
+        path (str): file path
+
+    Raises:
+        SaveFormatException: when file is not a save
+
+    Returns:
+        Board: saved game
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if data.startswith(MAGIC):
+        board = read_board(io.BytesIO(data))
+    else:
+        try:
+            parsed = json.loads(data.decode("UTF-8").split("\n", 1)[0])
+        except (UnicodeDecodeError, ValueError) as e:
+            raise SaveFormatException(f"Invalid save file: {path}") from e
+        if not validate_json(parsed) or parsed["player"] not in (0, 1):
+            raise SaveFormatException(f"Invalid save file: {path}")
+        board = Board()
+        board.board = parsed["board"]
+        board.ai = parsed["ai"]
+        board.player = parsed["player"]
+    return board
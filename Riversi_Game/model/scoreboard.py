@@ -0,0 +1,213 @@
+"""Module containing scoreboard stored in SQLite database
+
+Every nickname has one row with its total score and number of games. Results
+of a game are written in one transaction, so a crash never leaves half of
+them. Ranking queries use index on score. Old scoreboard.txt (JSON object of
+nickname: score) is imported on first open and renamed afterwards.
+"""
+
+import json
+import os
+import sqlite3
+from typing import Optional
+
+SCHEMA_VERSION = 1
+MIGRATED_SUFFIX = ".migrated"
+
+
+class Scoreboard:
+    """Persistent nickname to total score mapping
+
+    Args:
+        path (str): database file path, ":memory:" for temporary scoreboard
+        legacy_path (str | None): old JSON scoreboard imported into new database
+    """
+
+    def __init__(self, path: str, legacy_path: Optional[str] = None):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self.__create(legacy_path)
+
+    def __create(self, legacy_path: Optional[str]):
+        """Creates tables and imports old scoreboard in one transaction"""
+        legacy = self.__read_legacy(legacy_path)
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "nickname TEXT PRIMARY KEY, "
+                "score INTEGER NOT NULL, "
+                "games INTEGER NOT NULL DEFAULT 0)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, nickname)"
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO scores (nickname, score, games) VALUES (?, ?, 0)",
+                legacy.items(),
+            )
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        if legacy:
+            os.replace(legacy_path, legacy_path + MIGRATED_SUFFIX)
+
+    @staticmethod
+    def __read_legacy(legacy_path: Optional[str]) -> dict:
+        """Reads old JSON scoreboard, unreadable file is left in place and not imported"""
+        if legacy_path is None or not os.path.exists(legacy_path):
+            return {}
+        try:
+            with open(legacy_path, "r", encoding="UTF-8") as f:
+                data = json.loads(f.readline())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {
+            str(nickname): score
+            for nickname, score in data.items()
+            if isinstance(score, int) and not isinstance(score, bool)
+        }
+
+    def close(self):
+        """Function closing database"""
+        self.connection.close()
+
+    def add_results(self, results: list):
+        """Function adding scores of one game atomically
+
+        Args:
+            results (list[tuple[str, int]]): (nickname, score) pairs
+        """
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO scores (nickname, score, games) VALUES (?, ?, 1) "
+                "ON CONFLICT (nickname) DO UPDATE SET "
+                "score = score + excluded.score, games = games + 1",
+                results,
+            )
+
+    def get(self, nickname: str) -> Optional[int]:
+        """Function reading total score of nickname
+
+        Args:
+            nickname (str): player nickname
+
+        Returns:
+            int | None: total score or None if nickname has no score
+        """
+        row = self.connection.execute(
+            "SELECT score FROM scores WHERE nickname = ?", (nickname,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def top(self, count: int, offset: int = 0) -> list:
+        """Function reading best scores
+
+        Args:
+            count (int): number of returned rows
+            offset (int): number of best rows skipped
+
+        Returns:
+            list[tuple[str, int]]: (nickname, score) pairs, best first
+        """
+        return self.connection.execute(
+            "SELECT nickname, score FROM scores ORDER BY score DESC, nickname LIMIT ? OFFSET ?",
+            (count, offset),
+        ).fetchall()
+
+    def search(self, prefix: str, count: int, offset: int = 0) -> list:
+        """Function reading best scores of nicknames starting with prefix
+
+        Args:
+            prefix (str): beginning of nickname, case sensitive
+            count (int): number of returned rows
+            offset (int): number of best matching rows skipped
+
+        Returns:
+            list[tuple[str, int]]: (nickname, score) pairs, best first
+        """
+        return self.connection.execute(
+            "SELECT nickname, score FROM scores WHERE nickname >= ? AND nickname < ? "
+            "ORDER BY score DESC, nickname LIMIT ? OFFSET ?",
+            (prefix, _prefix_end(prefix), count, offset),
+        ).fetchall()
+
+    def search_ranked(self, prefix: str, count: int, offset: int = 0) -> list:
+        """Function reading best scores of nicknames starting with prefix with their rank,
+        rank of the first row is counted on score index, every next rank adds the rows
+        between it and the previous row, so the page costs one count up to its last row
+
+        Args:
+            prefix (str): beginning of nickname, case sensitive
+            count (int): number of returned rows
+            offset (int): number of best matching rows skipped
+
+        Returns:
+            list[tuple[int, str, int]]: (rank, nickname, score) triples, best first,
+                rank is position in ranking ordered like top
+        """
+        return self.connection.execute(
+            "WITH page AS ("
+            "SELECT nickname, score FROM scores WHERE nickname >= ? AND nickname < ? "
+            "ORDER BY score DESC, nickname LIMIT ? OFFSET ?), "
+            "ranked AS ("
+            "SELECT nickname, score, LAG(score) OVER ranking AS previous_score, "
+            "LAG(nickname) OVER ranking AS previous_nickname "
+            "FROM page WINDOW ranking AS (ORDER BY score DESC, nickname)) "
+            "SELECT SUM(1 + CASE "
+            "WHEN previous_score IS NULL THEN (SELECT COUNT(*) FROM scores "
+            "WHERE score > ranked.score OR (score = ranked.score AND nickname < ranked.nickname)) "
+            "WHEN previous_score = ranked.score THEN (SELECT COUNT(*) FROM scores "
+            "WHERE score = ranked.score AND nickname > previous_nickname "
+            "AND nickname < ranked.nickname) "
+            "ELSE (SELECT COUNT(*) FROM scores WHERE score < previous_score AND score > ranked.score) "
+            "+ (SELECT COUNT(*) FROM scores "
+            "WHERE score = previous_score AND nickname > previous_nickname) "
+            "+ (SELECT COUNT(*) FROM scores WHERE score = ranked.score AND nickname < ranked.nickname) "
+            "END) OVER (ORDER BY score DESC, nickname ROWS UNBOUNDED PRECEDING), "
+            "nickname, score FROM ranked ORDER BY score DESC, nickname",
+            (prefix, _prefix_end(prefix), count, offset),
+        ).fetchall()
+
+    def count(self, prefix: str = "") -> int:
+        """Function counting nicknames starting with prefix
+
+        Args:
+            prefix (str): beginning of nickname, empty counts every nickname
+
+        Returns:
+            int: number of nicknames
+        """
+        if not prefix:
+            return len(self)
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM scores WHERE nickname >= ? AND nickname < ?",
+            (prefix, _prefix_end(prefix)),
+        ).fetchone()[0]
+
+    def rank(self, nickname: str) -> Optional[int]:
+        """Function finding position of nickname in ranking ordered like top
+
+        Args:
+            nickname (str): player nickname
+
+        Returns:
+            int | None: 1 for the best player, None if nickname has no score
+        """
+        score = self.get(nickname)
+        if score is None:
+            return None
+        return 1 + self.connection.execute(
+            "SELECT COUNT(*) FROM scores WHERE score > ? OR (score = ? AND nickname < ?)",
+            (score, score, nickname),
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+
+def _prefix_end(prefix: str) -> str:
+    """Upper bound of strings starting with prefix (U+10FFFF sorts after every
+    character), prefix match becomes range on primary key index"""
+    return prefix + "\U0010FFFF"
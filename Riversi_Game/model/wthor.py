@@ -0,0 +1,266 @@
+"""Module containing reader of WTHOR game archives (.wtb)
+
+WTHOR file is a 16 byte header followed by fixed size game records. The file
+is memory mapped and read in chunks of records, every chunk is decoded and
+replayed with the NumPy move generator (model.batch) for all its games at
+once, so memory use does not grow with the size of the archive.
+
+Header: creation century, year, month, day (uint8 each), number of games
+(uint32), number of other records (uint16), year of games (uint16), board
+size (uint8, 0 or 8), game type (uint8), search depth (uint8), reserved
+
+Game record: tournament (uint16), black player (uint16), white player
+(uint16), black discs (uint8), theoretical black discs (uint8), 60 moves
+(uint8 each, 10 * row + column counted from 1, 0 after the last move)
+"""
+
+import mmap
+import os
+import struct
+from dataclasses import dataclass
+import numpy as np
+from exceptions.exceptions import WthorFormatException
+from model import batch
+from model import bitboard
+from model.board import Board
+
+HEADER = struct.Struct("<BBBBIHHBBBx")
+RECORD = np.dtype(
+    [
+        ("tournament", "<u2"),
+        ("black_player", "<u2"),
+        ("white_player", "<u2"),
+        ("black_score", "u1"),
+        ("theoretical_score", "u1"),
+        ("moves", "u1", (60,)),
+    ]
+)
+CHUNK_SIZE = 4096
+SUFFIX = ".wtb"
+
+NO_MOVE = -1
+INVALID_MOVE = -2
+# move code to bit index, row is x and column is y of the square
+_DECODE = np.full(256, INVALID_MOVE, dtype=np.int16)
+_DECODE[0] = NO_MOVE
+for _row in range(8):
+    for _column in range(8):
+        _DECODE[10 * (_row + 1) + _column + 1] = _row * 8 + _column
+
+
+@dataclass
+class WthorGame:
+    """Validated game of WTHOR archive, final position is after the last move"""
+
+    number: int  # position of game in archive, 1 is the first game
+    tournament: int
+    black_player: int
+    white_player: int
+    black_score: int
+    theoretical_score: int
+    moves: list
+    black: int
+    white: int
+    player: int  # side to move in final position
+
+
+class WthorFile:
+    """Memory mapped WTHOR archive
+
+    Args:
+        path (str): path of .wtb file
+
+    Raises:
+        WthorFormatException: when file is not a WTHOR game archive
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise WthorFormatException(f"Invalid WTHOR file: {path}")
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = HEADER.unpack_from(self.data, 0)
+        (self.count, self.year, board_size) = (fields[4], fields[6], fields[7])
+        if board_size not in (0, 8) or size < HEADER.size + self.count * RECORD.itemsize:
+            self.data.close()
+            raise WthorFormatException(f"Invalid WTHOR file: {path}")
+        # view of the mapped file, records are paged in when a chunk is read
+        self.records = np.frombuffer(self.data, RECORD, self.count, HEADER.size)
+
+    def close(self):
+        """Function unmapping archive"""
+        # view has to be released before the map can be closed
+        self.records = None
+        self.data.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def chunks(self, size: int = CHUNK_SIZE):
+        """Generator splitting records into chunks
+
+        Args:
+            size (int): number of records of every chunk
+
+        Yields:
+            tuple[int, np.ndarray]: (index of first record, records of chunk)
+        """
+        for start in range(0, self.count, size):
+            yield start, self.records[start : start + size]
+
+
+def decode_moves(codes: np.ndarray) -> np.ndarray:
+    """Function translating WTHOR move codes to bit indexes
+
+    Args:
+        codes (np.ndarray): (N, 60) uint8 move codes
+
+    Returns:
+        np.ndarray: (N, 60) int16 bit indexes, NO_MOVE after the last move
+            and INVALID_MOVE for codes that are not a square
+    """
+    return _DECODE[codes]
+
+
+def replay_moves(squares: np.ndarray) -> tuple:
+    """Function replaying many games at once, passes are implied
+
+    Args:
+        squares (np.ndarray): (N, 60) bit indexes as returned by decode_moves
+
+    Returns:
+        tuple[np.ndarray, ...]: (black, white, player, length, error ply, error square)
+            final uint64 bitboards, side to move after the game, number of moves,
+            index of the first wrong move or -1 and its bit index
+    """
+    count = len(squares)
+    own = np.full(count, bitboard.START_BLACK, dtype=np.uint64)
+    opp = np.full(count, bitboard.START_WHITE, dtype=np.uint64)
+    player = np.zeros(count, dtype=np.int8)
+    error_ply = np.full(count, -1, dtype=np.int16)
+    error_square = np.full(count, NO_MOVE, dtype=np.int16)
+
+    ended = np.maximum.accumulate(squares == NO_MOVE, axis=1)
+    length = np.argmax(ended, axis=1).astype(np.int16)
+    length[~ended[:, -1]] = squares.shape[1]
+    # moves after the end of game are reported at the first of them
+    late = ended & (squares != NO_MOVE)
+    late_games = np.nonzero(late.any(axis=1))[0]
+    error_ply[late_games] = np.argmax(late[late_games], axis=1)
+    error_square[late_games] = squares[late_games, error_ply[late_games]]
+
+    active = np.ones(count, dtype=bool)
+    for ply in range(squares.shape[1]):
+        active &= ply < length
+        games = np.nonzero(active)[0]
+        if not len(games):
+            break
+        moves = squares[games, ply]
+        (game_own, game_opp) = (own[games], opp[games])
+        legal = batch.legal_moves(game_own, game_opp)
+        passing = legal == 0
+        if passing.any():
+            (game_own[passing], game_opp[passing]) = (game_opp[passing], game_own[passing])
+            player[games[passing]] ^= 1
+            legal[passing] = batch.legal_moves(game_own[passing], game_opp[passing])
+
+        valid = moves >= 0
+        bits = np.left_shift(np.uint64(1), np.where(valid, moves, 0).astype(np.uint64))
+        legal_move = valid & ((legal & bits) != 0)
+        wrong = games[~legal_move]
+        error_ply[wrong] = ply
+        error_square[wrong] = moves[~legal_move]
+        active[wrong] = False
+
+        games = games[legal_move]
+        (game_own, game_opp) = batch.play(
+            game_own[legal_move], game_opp[legal_move], moves[legal_move]
+        )
+        (own[games], opp[games]) = (game_opp, game_own)
+        player[games] ^= 1
+
+    # side without legal move passes, unless the game is over
+    passing = (batch.legal_moves(own, opp) == 0) & (batch.legal_moves(opp, own) != 0)
+    (own[passing], opp[passing]) = (opp[passing], own[passing])
+    player[passing] ^= 1
+
+    white_to_move = player == 1
+    black = np.where(white_to_move, opp, own)
+    white = np.where(white_to_move, own, opp)
+    return black, white, player, length, error_ply, error_square
+
+
+def iter_games(path: str, errors: list, chunk_size: int = CHUNK_SIZE):
+    """Generator reading and validating every game of WTHOR archive
+
+    Args:
+        path (str): path of .wtb file
+        errors (list[str]): list collecting games that could not be replayed
+        chunk_size (int): number of games decoded and replayed at once
+
+    Raises:
+        WthorFormatException: when file is not a WTHOR game archive
+
+    Yields:
+        WthorGame: every valid game in archive order
+    """
+    archive = WthorFile(path)
+    try:
+        for start, records in archive.chunks(chunk_size):
+            squares = decode_moves(records["moves"])
+            (black, white, player, length, error_ply, error_square) = replay_moves(squares)
+            for index in range(len(records)):
+                number = start + index + 1
+                ply = int(error_ply[index])
+                if ply >= 0:
+                    code = int(records["moves"][index, ply])
+                    errors.append(
+                        f"{path}: game {number}: "
+                        f"{_describe_error(int(error_square[index]), code, ply >= length[index])} "
+                        f"at ply {ply + 1}"
+                    )
+                    continue
+                record = records[index]
+                yield WthorGame(
+                    number,
+                    int(record["tournament"]),
+                    int(record["black_player"]),
+                    int(record["white_player"]),
+                    int(record["black_score"]),
+                    int(record["theoretical_score"]),
+                    squares[index, : length[index]].tolist(),
+                    int(black[index]),
+                    int(white[index]),
+                    int(player[index]),
+                )
+    finally:
+        # the last yielded record has to be released before unmapping
+        record = records = None
+        archive.close()
+
+
+def _describe_error(square: int, code: int, after_end: bool) -> str:
+    if after_end:
+        return f"Move code {code} after the end of game"
+    if square == INVALID_MOVE:
+        return f"Invalid move code {code}"
+    return f"Illegal move {bitboard.square_name(square)}"
+
+
+def to_board(game: WthorGame) -> Board:
+    """Function creating board of final position of game
+
+    Args:
+        game (WthorGame): validated game
+
+    Returns:
+        Board: final position with moves as history, can be written with model.save
+    """
+    board = Board()
+    board.set_bitboards(0, game.black, game.white)
+    board.player = game.player
+    board.history = list(game.moves)
+    board.from_start = True
+    return board
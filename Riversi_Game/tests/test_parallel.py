@@ -0,0 +1,46 @@
+"""Tests of parallel search worker state
+
+Run from Riversi_Game directory:
+    python -m unittest discover tests
+"""
+
+import unittest
+from model import bitboard
+from engine import parallel
+from engine.search import disc_difference
+
+
+class WorkerSearchTest(unittest.TestCase):
+    """Worker functions are called in this process, like a pool worker would call them"""
+
+    def setUp(self):
+        parallel._init_worker(disc_difference, 1)
+        self.searcher = parallel._worker_searcher
+        (own, opp) = bitboard.play(bitboard.START_BLACK, bitboard.START_WHITE, 37)
+        self.position = (opp, own)
+
+    def search(self, search_id):
+        return parallel._search_child(*self.position, 3, -100, 100, None, search_id)
+
+    def test_generation_advances_between_root_searches(self):
+        self.search(1)
+        first = self.searcher.tt.generation
+        self.search(2)
+        self.assertEqual(self.searcher.tt.generation, first % 255 + 1)
+
+    def test_generation_is_kept_within_root_search(self):
+        self.search(1)
+        first = self.searcher.tt.generation
+        self.search(1)
+        self.assertEqual(self.searcher.tt.generation, first)
+
+    def test_killers_are_reset_for_new_root_search(self):
+        self.search(1)
+        self.assertTrue(any(any(killers) for killers in self.searcher.ordering.killers))
+        self.searcher.ordering.killers[1] = [63, 62]
+        self.search(2)
+        self.assertNotEqual(self.searcher.ordering.killers[1], [63, 62])
+
+
+if __name__ == "__main__":
+    unittest.main()
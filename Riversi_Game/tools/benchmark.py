@@ -0,0 +1,113 @@
+"""Benchmark suite of the engine
+
+Run from Riversi_Game directory:
+    python -m tools.benchmark search --depth 7 --workers 1 2 4
+"""
+
+import argparse
+import random
+import time
+from model import bitboard
+from engine.parallel import ParallelSearcher, default_workers
+from engine.search import SearchStatistics
+
+
+def random_positions(count: int, plies: int, seed: int = 0) -> list:
+    """Function generating positions by playing random moves from start position
+
+    Args:
+        count (int): number of positions
+        plies (int): number of random moves played in every position
+        seed (int): seed of random generator, same seed gives same positions
+
+    Returns:
+        list[tuple[int, int]]: (own, opp) bitboards with side to move having a legal move
+    """
+    generator = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        own, opp = bitboard.START_BLACK, bitboard.START_WHITE
+        for _ in range(plies):
+            moves = bitboard.legal_moves(own, opp)
+            if not moves:
+                own, opp = opp, own
+                moves = bitboard.legal_moves(own, opp)
+                if not moves:
+                    break
+            sq = generator.choice(list(bitboard.iter_squares(moves)))
+            own, opp = bitboard.play(own, opp, sq)
+            own, opp = opp, own
+        if bitboard.legal_moves(own, opp):
+            positions.append((own, opp))
+    return positions
+
+
+def benchmark_search(depth: int, positions: list, workers: list) -> list:
+    """Function timing fixed depth search for every worker count
+
+    Args:
+        depth (int): search depth
+        positions (list[tuple[int, int]]): positions to search
+        workers (list[int]): worker counts to compare
+
+    Returns:
+        list[dict]: one row per worker count with time, nodes, speedup against
+            first row and SearchStatistics summed over positions
+    """
+    rows = []
+    for worker_count in workers:
+        with ParallelSearcher(worker_count) as searcher:
+            statistics = SearchStatistics(depth=depth)
+            start = time.perf_counter()
+            for own, opp in positions:
+                statistics.add(searcher.search(own, opp, depth).statistics)
+            elapsed = time.perf_counter() - start
+        statistics.seconds = elapsed
+        rows.append(
+            {
+                "workers": worker_count,
+                "seconds": elapsed,
+                "nodes": statistics.nodes,
+                "nps": statistics.nps,
+                "speedup": rows[0]["seconds"] / elapsed if rows and elapsed else 1.0,
+                "statistics": statistics,
+            }
+        )
+    return rows
+
+
+def main():
+    """Command line entry point of benchmark suite"""
+    parser = argparse.ArgumentParser(description="Riversi engine benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    search_parser = subparsers.add_parser("search", help="parallel search speedup")
+    search_parser.add_argument("--depth", type=int, default=7)
+    search_parser.add_argument("--positions", type=int, default=8)
+    search_parser.add_argument("--plies", type=int, default=20)
+    search_parser.add_argument("--seed", type=int, default=0)
+    search_parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, default_workers()]
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "search":
+        positions = random_positions(args.positions, args.plies, args.seed)
+        print(f"depth {args.depth}, {len(positions)} positions")
+        for row in benchmark_search(args.depth, positions, args.workers):
+            print(
+                f"workers {row['workers']:>3}: {row['seconds']:8.3f} s "
+                f"{row['nodes']:>10} nodes {row['nps']:>10.0f} nps "
+                f"speedup {row['speedup']:.2f}x"
+            )
+            statistics = row["statistics"]
+            print(
+                f"             evals {statistics.evaluations} "
+                f"tt hits {statistics.tt_hits}/{statistics.tt_probes} "
+                f"cutoffs {sum(statistics.cutoffs)} first move {statistics.first_move_cutoffs:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
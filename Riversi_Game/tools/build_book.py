@@ -0,0 +1,65 @@
+"""Tool building opening book from game records
+
+Game records are text files with one game per line written as concatenated
+moves (e.g. f5d6c3d3c4), empty lines and lines starting with # are skipped.
+WTHOR archives (.wtb) are read as well.
+
+Run from Riversi_Game directory:
+    python -m tools.build_book games.txt --output book.bin --plies 14
+"""
+
+import argparse
+from exceptions.exceptions import WthorFormatException
+from model import bitboard
+from model import wthor
+from engine.book import DEFAULT_MAX_PLIES, build_book
+
+
+def read_games(paths: list, errors: list):
+    """Generator reading game records from text files and WTHOR archives
+
+    Args:
+        paths (list[str]): paths of game record files
+        errors (list[str]): list collecting lines and games that could not be parsed
+
+    Yields:
+        list[int]: bit indexes of moves of one game
+    """
+    for path in paths:
+        if path.endswith(wthor.SUFFIX):
+            try:
+                for game in wthor.iter_games(path, errors):
+                    yield game.moves
+            except WthorFormatException as e:
+                errors.append(str(e))
+            continue
+        with open(path, "r", encoding="UTF-8") as f:
+            for number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    yield bitboard.parse_moves(line)
+                except ValueError as e:
+                    errors.append(f"{path}:{number}: {e}")
+
+
+def main():
+    """Command line entry point of book builder"""
+    parser = argparse.ArgumentParser(description="Build Riversi opening book")
+    parser.add_argument("games", nargs="+", help="game record or .wtb files")
+    parser.add_argument("--output", default="book.bin")
+    parser.add_argument("--plies", type=int, default=DEFAULT_MAX_PLIES)
+    args = parser.parse_args()
+
+    errors: list[str] = []
+    (records, game_errors) = build_book(
+        read_games(args.games, errors), args.output, args.plies
+    )
+    for error in errors + game_errors:
+        print(error)
+    print(f"{records} records written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Tool building and querying game database
+
+Games are read from text game records and WTHOR archives (see
+tools.build_book) and from save files (.sav) whose history starts at the
+start position.
+
+Run from Riversi_Game directory:
+    python -m tools.database build games.txt Saves/*.sav --output games
+    python -m tools.database query games --moves f5d6
+"""
+
+import argparse
+from exceptions.exceptions import IllegalMoveException, SaveFormatException
+from model import bitboard
+from model import save
+from engine.database import GameDatabase, build_database
+from tools.build_book import read_games
+
+
+def read_sources(paths: list, errors: list):
+    """Generator reading games from save files and text game records
+
+    Args:
+        paths (list[str]): .sav files, .wtb files and game record files
+        errors (list[str]): list collecting sources that could not be read
+
+    Yields:
+        list[int]: bit indexes of moves of one game
+    """
+    for path in paths:
+        if not path.endswith(".sav"):
+            yield from read_games([path], errors)
+            continue
+        try:
+            with open(path, "rb") as f:
+                for board in save.iter_boards(f):
+                    if board.from_start:
+                        yield board.history
+        except SaveFormatException as e:
+            errors.append(f"{path}: {e}")
+
+
+def main():
+    """Command line entry point of game database tool"""
+    parser = argparse.ArgumentParser(description="Riversi game database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="build database from games")
+    build_parser.add_argument("games", nargs="+", help="game record, .wtb or .sav files")
+    build_parser.add_argument("--output", default="games")
+
+    query_parser = subparsers.add_parser("query", help="moves played in position")
+    query_parser.add_argument("database", help="database path without suffix")
+    query_parser.add_argument("--moves", default="", help="moves leading to position")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        errors: list[str] = []
+        (count, game_errors) = build_database(read_sources(args.games, errors), args.output)
+        for error in errors + game_errors:
+            print(error)
+        print(f"{count} games written to {args.output}")
+        return
+
+    try:
+        moves = bitboard.parse_moves(args.moves)
+        (own, opp, player) = (bitboard.START_BLACK, bitboard.START_WHITE, 0)
+        for own, opp, player, sq in bitboard.replay(moves):
+            pass
+        if moves:
+            (own, opp) = bitboard.play(own, opp, moves[-1])
+            (own, opp, player) = (opp, own, 1 - player)
+            if not bitboard.legal_moves(own, opp):
+                (own, opp, player) = (opp, own, 1 - player)
+    except (ValueError, IllegalMoveException) as e:
+        parser.error(str(e))
+
+    database = GameDatabase(args.database)
+    try:
+        print(f"{('black', 'white')[player]} to move, {len(database.games(own, opp))} games")
+        for item in database.lookup(own, opp):
+            print(
+                f"{bitboard.square_name(item.move)}: {item.games} games "
+                f"+{item.wins} ={item.draws} -{item.losses} average {item.average:+.1f}"
+            )
+    finally:
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
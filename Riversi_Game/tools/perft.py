@@ -0,0 +1,154 @@
+"""Perft, leaf node count of the game tree, used to check and time move generation
+
+Pass is counted as a ply, position where neither side can move is a leaf
+at any depth. Counts from start position are compared with REFERENCE.
+
+Run from Riversi_Game directory:
+    python -m tools.perft --depth 9
+    python -m tools.perft --depth 6 --save Saves/save_2024-01-01_12-00-00.sav
+    python -m tools.perft --depth 9 --batch
+"""
+
+import argparse
+import sys
+import time
+from model import bitboard
+from model import save
+
+# leaf counts from start position, index is depth
+REFERENCE = (
+    1,
+    4,
+    12,
+    56,
+    244,
+    1396,
+    8200,
+    55092,
+    390216,
+    3005288,
+    24571284,
+    212258800,
+)
+
+
+def perft(own: int, opp: int, depth: int, passed: bool = False) -> int:
+    """Function counting leaf nodes of game tree
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+        depth (int): number of plies
+        passed (bool): True if previous ply was a pass
+
+    Returns:
+        int: number of leaf nodes
+    """
+    moves = bitboard.legal_moves(own, opp)
+    if not moves:
+        if passed:
+            return 1
+        if depth == 0:
+            return 1
+        return perft(opp, own, depth - 1, True)
+    if depth <= 1:
+        # bulk counting, children of the last ply are not played
+        return moves.bit_count() if depth else 1
+
+    nodes = 0
+    while moves:
+        lowest = moves & -moves
+        moves ^= lowest
+        flipped = bitboard.flips(own, opp, lowest.bit_length() - 1)
+        nodes += perft(opp & ~flipped, own | flipped | lowest, depth - 1)
+    return nodes
+
+
+def perft_batch(own: int, opp: int, depth: int) -> int:
+    """Function counting leaf nodes level by level with NumPy move generation,
+    result is equal to perft
+
+    Args:
+        own (int): bitboard of side to move
+        opp (int): bitboard of opponent
+        depth (int): number of plies
+
+    Returns:
+        int: number of leaf nodes
+    """
+    import numpy as np
+    from model import batch
+
+    own_level = np.array([own], dtype=np.uint64)
+    opp_level = np.array([opp], dtype=np.uint64)
+    passed = np.zeros(1, dtype=bool)
+    finished = 0
+    for _ in range(depth):
+        stuck = batch.legal_moves(own_level, opp_level) == np.uint64(0)
+        finished += int((stuck & passed).sum())
+        passing = stuck & ~passed
+        (_, _, child_own, child_opp) = batch.expand(own_level, opp_level)
+        # positions without a move pass, their opponent moves next
+        (own_level, opp_level) = (
+            np.concatenate((child_own, opp_level[passing])),
+            np.concatenate((child_opp, own_level[passing])),
+        )
+        passed = np.zeros(len(own_level), dtype=bool)
+        passed[len(child_own) :] = True
+    return finished + len(own_level)
+
+
+def load_position(path: str) -> tuple[int, int]:
+    """Function reading position of game save
+
+    Args:
+        path (str): save file path
+
+    Raises:
+        SaveFormatException: when file is not a game save
+
+    Returns:
+        tuple[int, int]: (own, opp) bitboards of side to move
+    """
+    board = save.load(path)
+    return board.get_bitboards(board.player)
+
+
+def main():
+    """Command line entry point of perft"""
+    parser = argparse.ArgumentParser(description="Riversi move generator perft")
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--save", help="count from position of game save")
+    parser.add_argument(
+        "--batch", action="store_true", help="use NumPy move generation"
+    )
+    args = parser.parse_args()
+
+    if args.save:
+        (own, opp) = load_position(args.save)
+    else:
+        (own, opp) = (bitboard.START_BLACK, bitboard.START_WHITE)
+    count = perft_batch if args.batch else perft
+
+    failed = False
+    for depth in range(1, args.depth + 1):
+        start = time.perf_counter()
+        nodes = count(own, opp, depth)
+        elapsed = time.perf_counter() - start
+        status = ""
+        if not args.save and depth < len(REFERENCE):
+            if nodes == REFERENCE[depth]:
+                status = "ok"
+            else:
+                status = f"MISMATCH, expected {REFERENCE[depth]}"
+                failed = True
+        nps = nodes / elapsed if elapsed else 0.0
+        print(
+            f"depth {depth:>2}: {nodes:>12} nodes {elapsed:8.3f} s {nps:>12.0f} nps {status}"
+        )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+"""Self-play tournament between engine configurations
+
+Every pair of engines plays every opening twice, once with each color.
+Openings are random move sequences from start position, games are spread
+over a process pool and every worker keeps its engines between games.
+
+Engine is given as name:option=value,... with options
+    time     seconds per move (default 0.1)
+    depth    maximal search depth
+    eval     pattern (default) or disc
+    weights  pattern evaluation weights file
+    book     opening book file
+    endgame  solve exactly with this many empties or less
+    tt       transposition table size in MB
+
+Run from Riversi_Game directory:
+    python -m tools.tournament --engine new:time=0.1 --engine old:time=0.1,eval=disc --openings 50
+"""
+
+import argparse
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+from model import bitboard
+from model.board import Board
+from engine import endgame
+from engine.endgame import EndgameSolver
+from engine.engine import DEFAULT_ENDGAME_EMPTIES, Engine, create_engine
+from engine.parallel import default_workers
+from engine.search import MAX_DEPTH, Searcher, disc_difference
+from engine.transposition import TranspositionTable
+
+DEFAULT_TIME_LIMIT = 0.1
+DEFAULT_TT_SIZE_MB = 4
+CONFIDENCE_Z = 1.96  # 95% confidence interval
+
+
+@dataclass(frozen=True)
+class EngineSpec:
+    """Configuration of tournament engine"""
+
+    name: str
+    time_limit: float = DEFAULT_TIME_LIMIT
+    max_depth: int = MAX_DEPTH
+    evaluation: str = "pattern"
+    weights: Optional[str] = None
+    book: Optional[str] = None
+    endgame_empties: int = DEFAULT_ENDGAME_EMPTIES
+    tt_size_mb: int = DEFAULT_TT_SIZE_MB
+
+
+@dataclass
+class GameResult:
+    """Result of one tournament game, times are sums of thinking time in seconds"""
+
+    black: str
+    white: str
+    black_discs: int
+    white_discs: int
+    moves: dict = field(default_factory=dict)
+    seconds: dict = field(default_factory=dict)
+
+
+def parse_engine(text: str) -> EngineSpec:
+    """Function parsing engine given on command line
+
+    Args:
+        text (str): name:option=value,... (see module documentation)
+
+    Raises:
+        ValueError: when text is not a valid engine
+
+    Returns:
+        EngineSpec: parsed configuration
+    """
+    (name, _, options) = text.partition(":")
+    if not name:
+        raise ValueError(f"Engine without name: {text}")
+    values = {}
+    for option in filter(None, options.split(",")):
+        (key, _, value) = option.partition("=")
+        if key == "time":
+            values["time_limit"] = float(value)
+        elif key == "depth":
+            values["max_depth"] = int(value)
+        elif key == "eval":
+            if value not in ("pattern", "disc"):
+                raise ValueError(f"Unknown evaluation: {value}")
+            values["evaluation"] = value
+        elif key == "weights":
+            values["weights"] = value
+        elif key == "book":
+            values["book"] = value
+        elif key == "endgame":
+            values["endgame_empties"] = int(value)
+        elif key == "tt":
+            values["tt_size_mb"] = int(value)
+        else:
+            raise ValueError(f"Unknown engine option: {key}")
+    return EngineSpec(name, **values)
+
+
+def build_engine(spec: EngineSpec) -> Engine:
+    """Function building engine of configuration
+
+    Args:
+        spec (EngineSpec): engine configuration
+
+    Returns:
+        Engine: single process engine
+    """
+    if spec.evaluation == "disc":
+        searcher = Searcher(disc_difference, TranspositionTable(spec.tt_size_mb))
+        return Engine(searcher, None, EndgameSolver(), spec.endgame_empties, endgame.EXACT)
+    return create_engine(
+        spec.weights,
+        spec.book,
+        tt_size_mb=spec.tt_size_mb,
+        endgame_empties=spec.endgame_empties,
+    )
+
+
+def random_openings(count: int, plies: int, seed: int = 0) -> list:
+    """Function generating distinct openings by playing random moves from start position
+
+    Args:
+        count (int): number of openings
+        plies (int): number of moves of every opening
+        seed (int): seed of random generator, same seed gives same openings
+
+    Returns:
+        list[list[int]]: openings as lists of move bit indexes
+    """
+    generator = random.Random(seed)
+    openings = []
+    seen = set()
+    attempts = 0
+    while len(openings) < count and attempts < count * 100:
+        attempts += 1
+        (own, opp) = (bitboard.START_BLACK, bitboard.START_WHITE)
+        moves = []
+        for _ in range(plies):
+            legal = bitboard.legal_moves(own, opp)
+            if not legal:
+                break
+            sq = generator.choice(list(bitboard.iter_squares(legal)))
+            moves.append(sq)
+            (own, opp) = bitboard.play(own, opp, sq)
+            (own, opp) = (opp, own)
+        # openings equal up to symmetry would be the same game twice
+        position = bitboard.canonical(own, opp)[:2]
+        if len(moves) == plies and position not in seen:
+            seen.add(position)
+            openings.append(moves)
+    return openings
+
+
+_worker_engines: dict = {}
+
+
+def play_game(opening: list, black: EngineSpec, white: EngineSpec) -> GameResult:
+    """Function playing one game from opening to the end
+
+    Engines are created on first use and kept for later games of the process.
+
+    Args:
+        opening (list[int]): moves played before engines take over
+        black (EngineSpec): engine playing black
+        white (EngineSpec): engine playing white
+
+    Returns:
+        GameResult: final disc counts and thinking time of both engines
+    """
+    specs = (black, white)
+    engines = []
+    for spec in specs:
+        if spec not in _worker_engines:
+            _worker_engines[spec] = build_engine(spec)
+        engines.append(_worker_engines[spec])
+
+    board = Board()
+    for _, _, player, sq in bitboard.replay(opening):
+        board.play(player, sq)
+        board.player = 1 - player
+
+    result = GameResult(
+        black.name,
+        white.name,
+        0,
+        0,
+        {black.name: 0, white.name: 0},
+        {black.name: 0.0, white.name: 0.0},
+    )
+    passed = False
+    while True:
+        if not board.has_legal_move(board.player):
+            if passed:
+                break
+            passed = True
+            board.player = 1 - board.player
+            continue
+        passed = False
+        spec = specs[board.player]
+        (own, opp) = board.get_bitboards(board.player)
+        start = time.perf_counter()
+        move = engines[board.player].choose_move(
+            own, opp, spec.time_limit, spec.max_depth
+        ).move
+        result.seconds[spec.name] += time.perf_counter() - start
+        result.moves[spec.name] += 1
+        board.play(board.player, move)
+        board.player = 1 - board.player
+
+    (result.black_discs, result.white_discs) = board.counts
+    return result
+
+
+def elo_difference(score: float) -> float:
+    """Function translating expected score to Elo difference
+
+    Args:
+        score (float): points per game, 0 to 1
+
+    Returns:
+        float: Elo difference, infinite for score 0 or 1
+    """
+    if score <= 0.0:
+        return -math.inf
+    if score >= 1.0:
+        return math.inf
+    return 400.0 * math.log10(score / (1.0 - score))
+
+
+def match_statistics(results: list, first: str, second: str) -> dict:
+    """Function computing result of first engine against second
+
+    Args:
+        results (list[GameResult]): tournament games
+        first (str): name of engine
+        second (str): name of opponent
+
+    Returns:
+        dict: games, wins, draws, losses, score, elo and its 95% error margin
+    """
+    points = []
+    for result in results:
+        if {result.black, result.white} != {first, second}:
+            continue
+        difference = result.black_discs - result.white_discs
+        if result.white == first:
+            difference = -difference
+        points.append(1.0 if difference > 0 else 0.5 if difference == 0 else 0.0)
+
+    games = len(points)
+    score = sum(points) / games if games else 0.5
+    variance = sum((point - score) ** 2 for point in points) / games if games else 0.0
+    margin = CONFIDENCE_Z * math.sqrt(variance / games) if games else 0.0
+    elo = elo_difference(score)
+    if 0.0 < score < 1.0:
+        # margin of score translated with slope of Elo curve at score
+        error = margin * 400.0 / (math.log(10) * score * (1.0 - score))
+    else:
+        error = math.inf
+    return {
+        "games": games,
+        "wins": points.count(1.0),
+        "draws": points.count(0.5),
+        "losses": points.count(0.0),
+        "score": score,
+        "elo": elo,
+        "error": error,
+    }
+
+
+def run_tournament(
+    engines: list, openings: list, workers: int = 1, progress=None
+) -> list:
+    """Function playing every pair of engines from every opening with both colors
+
+    Args:
+        engines (list[EngineSpec]): participating engines, names have to be unique
+        openings (list[list[int]]): opening move lists
+        workers (int): number of processes playing games
+        progress (Callable[[int, int], None] | None): called with (finished, total) games
+
+    Returns:
+        list[GameResult]: results of every game
+    """
+    tasks = []
+    for index, first in enumerate(engines):
+        for second in engines[index + 1 :]:
+            for opening in openings:
+                tasks.append((opening, first, second))
+                tasks.append((opening, second, first))
+
+    results = []
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(play_game, *task) for task in tasks]
+            for future in futures:
+                results.append(future.result())
+                if progress is not None:
+                    progress(len(results), len(tasks))
+    else:
+        for task in tasks:
+            results.append(play_game(*task))
+            if progress is not None:
+                progress(len(results), len(tasks))
+    return results
+
+
+def main():
+    """Command line entry point of tournament runner"""
+    parser = argparse.ArgumentParser(description="Riversi self-play tournament")
+    parser.add_argument(
+        "--engine", action="append", required=True, help="name:option=value,..."
+    )
+    parser.add_argument("--openings", type=int, default=20)
+    parser.add_argument("--plies", type=int, default=6, help="moves of every opening")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    args = parser.parse_args()
+
+    engines = [parse_engine(text) for text in args.engine]
+    if len(engines) < 2 or len({spec.name for spec in engines}) != len(engines):
+        parser.error("at least two engines with unique names are needed")
+    openings = random_openings(args.openings, args.plies, args.seed)
+
+    def progress(finished, total):
+        print(f"\r{finished}/{total} games", end="", flush=True)
+
+    start = time.perf_counter()
+    results = run_tournament(engines, openings, args.workers, progress)
+    print(f"\r{len(results)} games in {time.perf_counter() - start:.1f} s")
+
+    for index, first in enumerate(engines):
+        for second in engines[index + 1 :]:
+            stats = match_statistics(results, first.name, second.name)
+            print(
+                f"{first.name} vs {second.name}: +{stats['wins']} ={stats['draws']} "
+                f"-{stats['losses']} score {stats['score']:.3f} "
+                f"elo {stats['elo']:+.0f} +/- {stats['error']:.0f}"
+            )
+    for spec in engines:
+        moves = sum(result.moves.get(spec.name, 0) for result in results)
+        seconds = sum(result.seconds.get(spec.name, 0.0) for result in results)
+        average = seconds / moves if moves else 0.0
+        print(f"{spec.name}: {moves} moves, {average * 1000:.1f} ms per move")
+
+
+if __name__ == "__main__":
+    main()
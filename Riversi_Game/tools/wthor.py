@@ -0,0 +1,46 @@
+"""Tool importing WTHOR game archives
+
+Every valid game is written as save record (see model.save) of its final
+position with the moves as history, so the output can be loaded in the game
+and read by tools.database. Games with illegal moves are reported and skipped.
+
+Run from Riversi_Game directory:
+    python -m tools.wthor WTH_2001.wtb WTH_2002.wtb --output games.sav
+"""
+
+import argparse
+import time
+from exceptions.exceptions import WthorFormatException
+from model import save
+from model import wthor
+
+
+def main():
+    """Command line entry point of WTHOR importer"""
+    parser = argparse.ArgumentParser(description="Import WTHOR game archives")
+    parser.add_argument("archives", nargs="+", help=".wtb files")
+    parser.add_argument("--output", default="games.sav")
+    parser.add_argument("--chunk", type=int, default=wthor.CHUNK_SIZE, help="games replayed at once")
+    args = parser.parse_args()
+
+    errors: list[str] = []
+    count = 0
+    start = time.perf_counter()
+    with open(args.output, "wb") as f:
+        for path in args.archives:
+            try:
+                for game in wthor.iter_games(path, errors, args.chunk):
+                    save.write_board(f, wthor.to_board(game))
+                    count += 1
+            except WthorFormatException as e:
+                errors.append(str(e))
+    seconds = time.perf_counter() - start
+
+    for error in errors:
+        print(error)
+    rate = count / seconds if seconds else 0.0
+    print(f"{count} games written to {args.output} in {seconds:.1f} s ({rate:.0f} games/s)")
+
+
+if __name__ == "__main__":
+    main()
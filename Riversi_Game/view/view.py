@@ -1,14 +1,16 @@
 """Module containing views for application"""
 
-from json import JSONDecodeError
+from collections import deque
 from tkinter import filedialog
 from tkinter import simpledialog
-import time
 import tkinter as tk
-from tkinter import Scrollbar, messagebox
+from tkinter import messagebox
 from exceptions.exceptions import SaveFormatException
 from controller.controller import Controller
 
+ANIMATION_FRAMES = 8  # frames of one flip, disk narrows in old color and widens in new one
+ANIMATION_FRAME_MS = 30
+
 
 class Game(tk.Frame):
     """Class representing game windows"""
@@ -62,8 +64,20 @@ class Game(tk.Frame):
 
         self.draw_board()
         self.fields.bind("<Button-1>", self.mouse_click_handler)
+        # one persistent disk item per square, shown state mirrors the canvas
+        self.disks = [
+            [self.create_disk(x, y, "") for y in range(self.column_count)]
+            for x in range(self.column_count)
+        ]
+        self.shown = [["" for _ in range(self.column_count)] for _ in range(self.column_count)]
         self.create_start_disks()
 
+        # 1.0 is normal speed, 0 disables animation
+        self.animation_speed = 1.0
+        self.animations: deque = deque()
+        self.animation_job = None
+        self.animated: tuple = ([], None)  # squares and board of running animation
+
     def set_controller(self, controller: Controller):
         """Controller setter
 
@@ -85,32 +99,130 @@ class Game(tk.Frame):
                     outline="black",
                 )
 
-    def draw_played_disk(self, x, y, color):
-        """Function draws played disk before updating whole board
+    def animate_move(self, x, y, color, board):
+        """Function queuing animation of played move, animations run one after another
+        on the event loop, pending ones are shown at once when moves pile up
 
         Args:
             x (int): first disk coordinate
             y (int): second disk coordinate
             color (string): disk color
+            board (list[list[string]]): Board state after the move
+        """
+        self.animations.append((x, y, color, [row[:] for row in board]))
+        if self.animation_job is None:
+            self.__next_animation()
+
+    def set_animation_speed(self, speed: float):
+        """Sets speed of animations
+
+        Args:
+            speed (float): 1.0 is normal speed, higher is faster, 0 disables animation
         """
-        self.create_disk(x, y, color)
-        self.fields.update()
-        time.sleep(0.5)
+        self.animation_speed = speed
+        if speed <= 0:
+            self.finish_animations()
+
+    def finish_animations(self):
+        """Function stopping animations and showing board of last queued move"""
+        board = None
+        if self.animations:
+            board = self.animations[-1][3]
+        self.animations.clear()
+        if self.animation_job is not None:
+            self.after_cancel(self.animation_job)
+            self.animation_job = None
+            (squares, animated_board) = self.animated
+            self.__reset_disks(squares)
+            board = board or animated_board
+        if board is not None:
+            self.__show(board)
 
     def update_board(self, board):
-        """Function updating whole board with flipped disk
+        """Function updating board at once, queued animations are dropped
 
         Args:
             board (list[list[string]]): Board state to be reflected in ui
         """
-        self.fields.delete("tile")
+        self.finish_animations()
+        self.__show(board)
+        self.fields.update_idletasks()
 
+    def __show(self, board):
+        """Redraws only squares which changed since last update"""
         for x in range(self.column_count):
             for y in range(self.column_count):
-                if board[x][y] != "":
-                    self.create_disk(x, y, board[x][y])
+                if board[x][y] != self.shown[x][y]:
+                    self.set_disk(x, y, board[x][y])
+
+    def __next_animation(self):
+        self.animation_job = None
+        while self.animations:
+            (x, y, color, board) = self.animations.popleft()
+            self.set_disk(x, y, color)
+            if self.animation_speed > 0 and not self.animations:
+                flipped = [
+                    (fx, fy)
+                    for fx in range(self.column_count)
+                    for fy in range(self.column_count)
+                    if board[fx][fy] != self.shown[fx][fy]
+                ]
+                self.animated = (flipped, board)
+                self.__animate_frame(flipped, board, 1)
+                return
+            # animation disabled or more moves waiting
+            self.__show(board)
+
+    def __reset_disks(self, squares: list):
+        """Restores size and shown color of disks changed by animation"""
+        for x, y in squares:
+            self.fields.coords(self.disks[x][y], *self.disk_bounds(x, y))
+            if self.shown[x][y]:
+                self.fields.itemconfigure(self.disks[x][y], fill=self.shown[x][y])
+
+    def __animate_frame(self, squares: list, board, frame: int):
+        if frame > ANIMATION_FRAMES:
+            self.__reset_disks(squares)
+            self.__show(board)
+            self.__next_animation()
+            return
+        scale = abs(1 - 2 * frame / ANIMATION_FRAMES)
+        for x, y in squares:
+            (left, top, right, bottom) = self.disk_bounds(x, y)
+            half_width = (right - left) / 2 * scale
+            middle = (left + right) / 2
+            self.fields.coords(
+                self.disks[x][y], middle - half_width, top, middle + half_width, bottom
+            )
+            if 2 * frame >= ANIMATION_FRAMES:
+                self.fields.itemconfigure(self.disks[x][y], fill=board[x][y])
+        delay = max(1, int(ANIMATION_FRAME_MS / self.animation_speed))
+        self.animation_job = self.after(
+            delay, lambda: self.__animate_frame(squares, board, frame + 1)
+        )
+
+    def set_disk(self, x: int, y: int, color: str):
+        """Function showing disk of given color on square, empty color hides the disk
+
+        Args:
+            x (int): first disk coordinate
+            y (int): second disk coordinate
+            color (str): disk color or "" for empty square
+        """
+        if color:
+            self.fields.itemconfigure(self.disks[x][y], fill=color, state="normal")
+        else:
+            self.fields.itemconfigure(self.disks[x][y], state="hidden")
+        self.shown[x][y] = color
+
+    def schedule(self, delay: int, callback):
+        """Function scheduling callback on tkinter event loop
 
-        self.fields.update()
+        Args:
+            delay (int): delay in milliseconds
+            callback (Callable): function called after delay
+        """
+        self.after(delay, callback)
 
     def mouse_click_handler(self, event):
         """Function handling mouse click
@@ -136,13 +248,13 @@ class Game(tk.Frame):
 
     def create_start_disks(self):
         """Creates starting disk"""
-        self.create_disk(3, 3, "white")
-        self.create_disk(4, 4, "white")
-        self.create_disk(4, 3, "black")
-        self.create_disk(3, 4, "black")
+        self.set_disk(3, 3, "white")
+        self.set_disk(4, 4, "white")
+        self.set_disk(4, 3, "black")
+        self.set_disk(3, 4, "black")
 
     def create_disk(self, row: int, column: int, color: str) -> int:
-        """Function creating oval (disk) on canvas
+        """Function creating oval (disk) on canvas, disk without color is hidden
 
         Args:
             row (int): row of board
@@ -152,16 +264,31 @@ class Game(tk.Frame):
         Returns:
             int: id of disk
         """
-        padding = self.field_size - self.disk_size
         disk = self.fields.create_oval(
+            *self.disk_bounds(row, column),
+            fill=color,
+            tags="tile",
+            state="normal" if color else "hidden",
+        )
+        return disk
+
+    def disk_bounds(self, row: int, column: int) -> tuple:
+        """Function computing bounding box of disk on canvas
+
+        Args:
+            row (int): row of board
+            column (int): column of board
+
+        Returns:
+            tuple[float, float, float, float]: left, top, right and bottom of disk
+        """
+        padding = self.field_size - self.disk_size
+        return (
             (column * self.field_size) + padding,
             (row * self.field_size) + padding,
             (column * self.field_size) + self.disk_size,
             (row * self.field_size) + self.disk_size,
-            fill=color,
-            tags="tile",
         )
-        return disk
 
     def set_current_player_label(self, player: str):
         """Sets label telling which player's turn is it
@@ -368,7 +495,7 @@ class Menu(tk.Frame):
     def load_button_action(self):
         """Action after pressing button_load_game"""
         filepath = filedialog.askopenfilename(
-            defaultextension="txt", initialdir="Saves"
+            defaultextension="sav", initialdir="Saves"
         )
 
         try:
@@ -376,8 +503,6 @@ class Menu(tk.Frame):
             self.button_continue["state"] = "normal"
         except SaveFormatException as e:
             messagebox.showinfo("Error", str(e))
-        except JSONDecodeError as e:
-            messagebox.showinfo("Error", str(e))
 
     def new_game_button_action(self):
         """Action after pressing new game button"""
@@ -419,18 +544,72 @@ class Leaderboard(tk.Frame):
             font=("Impact", 20),
         )
         self.button_to_main_window.pack()
-        self.scroll_bar = Scrollbar(self)
+
+        self.page = 0
+        self.page_count = 1
+        self.query = ""
+        self.search_frame = tk.Frame(self, background="#6e3a00", pady=10)
+        self.search_entry = tk.Entry(self.search_frame, font=("Impact", 16), width=20)
+        self.search_entry.bind("<Return>", lambda _: self.search_button_action())
+        self.button_search = tk.Button(
+            self.search_frame,
+            text="Search",
+            command=self.search_button_action,
+            bg="#026e00",
+            fg="#ffe200",
+            activebackground="#015400",
+            activeforeground="#ffe200",
+            font=("Impact", 14),
+        )
+        self.search_entry.pack(side="left", padx=5)
+        self.button_search.pack(side="left")
+        self.search_frame.pack()
+
+        self.navigation_frame = tk.Frame(self, background="#6e3a00", pady=10)
+        self.button_previous = tk.Button(
+            self.navigation_frame,
+            text="<",
+            command=lambda: self.change_page(-1),
+            bg="#026e00",
+            fg="#ffe200",
+            activebackground="#015400",
+            activeforeground="#ffe200",
+            width=4,
+            font=("Impact", 14),
+        )
+        self.page_label = tk.Label(
+            self.navigation_frame,
+            text="1 / 1",
+            background="#6e3a00",
+            foreground="#ffe200",
+            font=("Impact", 16),
+            padx=15,
+        )
+        self.button_next = tk.Button(
+            self.navigation_frame,
+            text=">",
+            command=lambda: self.change_page(1),
+            bg="#026e00",
+            fg="#ffe200",
+            activebackground="#015400",
+            activeforeground="#ffe200",
+            width=4,
+            font=("Impact", 14),
+        )
+        self.button_previous.pack(side="left")
+        self.page_label.pack(side="left")
+        self.button_next.pack(side="left")
+        self.navigation_frame.pack(side="bottom")
+
         self.leaderboard = tk.Text(
             self,
-            wrap="word",
+            wrap="none",
             background="#6e3a00",
             foreground="#ffe200",
-            yscrollcommand=self.scroll_bar.set,
             font=("Impact", 20),
-            state = "disabled"
+            state="disabled",
         )
-        self.scroll_bar.pack(side="left", fill="y")
-        self.leaderboard.pack(side="right", fill="both", expand=True)
+        self.leaderboard.pack(fill="both", expand=True)
         self.controller: Controller
 
     def set_controller(self, controller: Controller):
@@ -441,14 +620,38 @@ class Leaderboard(tk.Frame):
         """
         self.controller = controller
 
-    def populate_leaderboard(self, score: dict):
-        """Add score board from controller to leaderboard text field
+    def search_button_action(self):
+        """Action after pressing search button, shows first page of matching nicknames"""
+        self.controller.show_leaderboard_page(0, self.search_entry.get().strip())
+
+    def change_page(self, step: int):
+        """Shows neighbouring page of current listing
 
         Args:
-            score (dict): scoreboard
+            step (int): -1 for previous page, 1 for next page
         """
+        self.controller.show_leaderboard_page(self.page + step, self.query)
+
+    def populate_leaderboard(self, rows: list, page: int, page_count: int, query: str):
+        """Show one page of scoreboard in leaderboard text field
+
+        Args:
+            rows (list[tuple[int, str, int]]): (rank, nickname, score) of visible rows
+            page (int): shown page, starting from 0
+            page_count (int): number of pages
+            query (str): nickname prefix rows were searched with, empty for whole scoreboard
+        """
+        self.page = page
+        self.page_count = page_count
+        self.query = query
+        self.page_label.config(text=f"{page + 1} / {page_count}")
+        self.button_previous["state"] = "normal" if page > 0 else "disabled"
+        self.button_next["state"] = "normal" if page + 1 < page_count else "disabled"
+
         self.leaderboard.configure(state="normal")
         self.leaderboard.delete("1.0", "end")
-        for key, value in score.items():
-            self.leaderboard.insert(tk.END, f"{key}: {value}\n")
+        if not rows:
+            self.leaderboard.insert(tk.END, "No scores\n")
+        for rank, nickname, score in rows:
+            self.leaderboard.insert(tk.END, f"{rank}. {nickname}: {score}\n")
         self.leaderboard.configure(state="disabled")